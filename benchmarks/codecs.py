@@ -0,0 +1,32 @@
+import sys
+import time
+import tempfile
+from pathlib import Path
+from benchmarks.storage import build_dataset, POKEMON_PER_USER
+from sdk.codecs import CODECS, encode, decode
+
+POKEMON = 1_000_000
+
+def run(pokemon: int = POKEMON) -> None:
+    data = build_dataset(pokemon // POKEMON_PER_USER)
+    print(f"{len(data['pokemon'])} pokemon, {len(data['users'])} users")
+    print(f"{'codec':18} {'save ms':>9} {'load ms':>9} {'MiB':>8}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "snapshot"
+        for codec in CODECS:
+            started = time.perf_counter()
+            path.write_bytes(encode(data, codec))
+            save = (time.perf_counter() - started) * 1000
+            size = path.stat().st_size
+            
+            started = time.perf_counter()
+            loaded = decode(path.read_bytes())
+            load = (time.perf_counter() - started) * 1000
+            
+            assert len(loaded["pokemon"]) == len(data["pokemon"])
+            del loaded
+            print(f"{codec:18} {save:9.0f} {load:9.0f} {size / 1048576:8.1f}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else POKEMON)
@@ -0,0 +1,67 @@
+import io
+import time
+import statistics
+from typing import Callable, Dict
+from PIL import Image
+import numpy as np
+from sdk.api.services import APIService
+from utilities import canvas
+from utilities.encoding import DEFAULT_ENCODING, EncodingPolicy, encode_image
+
+CANDIDATES: Dict[str, EncodingPolicy] = {
+    "png-level0": EncodingPolicy(palette=False, compress_levels=(0,), size_budget=None),
+    "png-level1": EncodingPolicy(palette=False, compress_levels=(1,), size_budget=None),
+    "png-level6": EncodingPolicy(palette=False, compress_levels=(6,), size_budget=None),
+    "png-palette-level1": EncodingPolicy(compress_levels=(1,), size_budget=None),
+    "png-palette": EncodingPolicy(compress_levels=(6,), size_budget=None),
+    "png-palette-level9": EncodingPolicy(compress_levels=(9,), size_budget=None),
+    "png-palette-lossy": EncodingPolicy(lossy_palette=True, compress_levels=(6,), size_budget=None),
+    "webp-lossless": EncodingPolicy(format="WEBP"),
+    "default": DEFAULT_ENCODING,
+}
+
+ROUNDS = 10
+
+def _composites(api: APIService) -> Dict[str, Callable[[], Image.Image]]:
+    front, back = api.get_pokemon_sprite({"species_id": 6})
+    raw = EncodingPolicy(palette=False, compress_levels=(0,), size_budget=None)
+
+    def decoded(func, *args) -> Callable[[], Image.Image]:
+        def build() -> Image.Image:
+            image = Image.open(func(*args, encoding=raw))
+            image.load()
+            return image
+        return build
+
+    return {
+        "pokemon (lab)": decoded(canvas._compose_pokemon, front, "info:lab"),
+        "pokemon (gen2)": decoded(canvas._compose_pokemon, front, "info:gen2"),
+        "battle": decoded(canvas._compose_battle, back, front, "arena:cave"),
+        "profile": decoded(canvas._compose_profile, [front, back] * 3, "textures:profile"),
+    }
+
+def _is_lossless(original: Image.Image, data: bytes) -> bool:
+    with Image.open(io.BytesIO(data)) as decoded:
+        a = np.asarray(original.convert("RGBA"))
+        b = np.asarray(decoded.convert("RGBA"))
+        return a.shape == b.shape and bool((a == b).all())
+
+def run() -> None:
+    api = APIService()
+
+    print(f"{'composite':16} {'policy':18} {'encode ms':>10} {'bytes':>9} {'lossless':>9}")
+    for name, build in _composites(api).items():
+        image = build()
+        for label, policy in CANDIDATES.items():
+            timings = []
+            data = b""
+            for _ in range(ROUNDS):
+                start = time.perf_counter()
+                data = encode_image(image, policy).getvalue()
+                timings.append((time.perf_counter() - start) * 1000)
+            lossless = "yes" if _is_lossless(image, data) else "no"
+            print(f"{name:16} {label:18} {statistics.median(timings):10.2f} {len(data):9d} {lossless:>9}")
+        image.close()
+
+if __name__ == "__main__":
+    run()
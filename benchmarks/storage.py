@@ -0,0 +1,81 @@
+import time
+import random
+import orjson
+import tempfile
+import statistics
+from pathlib import Path
+from typing import List
+from sdk.database import Database
+from sdk.repositories.user_repository import UserRepository
+from sdk.shards import migrate
+from sdk.constants import STAT_KEYS
+
+USER_COUNTS = (10_000, 100_000)
+POKEMON_PER_USER = 6
+ITEMS_PER_USER = 3
+ROUNDS = 5
+
+def build_dataset(users: int) -> dict:
+    rng = random.Random(users)
+    data = {"users": {}, "pokemon": [], "bags": []}
+
+    for n in range(users):
+        user_id = str(100_000_000_000_000_000 + n)
+        data["users"][user_id] = {
+            "id": user_id, "gender": "Male", "money": rng.randint(0, 10_000), "last_pokemon_id": POKEMON_PER_USER,
+            "badges": [], "rng_seed": rng.getrandbits(32), "timezone": "America/Sao_Paulo",
+            "location": "pallet-town-area", "created_at": "2025-01-01T00:00:00"
+        }
+        for pokemon_id in range(1, POKEMON_PER_USER + 1):
+            data["pokemon"].append({
+                "id": pokemon_id, "owner_id": user_id, "species_id": rng.randint(1, 386), "name": "bulbasaur",
+                "level": rng.randint(1, 100), "exp": rng.randint(0, 100_000), "is_shiny": False, "on_party": pokemon_id <= 6,
+                "party_pos": pokemon_id, "is_favorite": False, "background": "lab", "nature": "hardy", "ability": "overgrow",
+                "gender": "Male", "happiness": 70, "current_hp": None, "growth_type": "medium-slow",
+                "ivs": {k: rng.randint(0, 31) for k in STAT_KEYS}, "evs": {k: 0 for k in STAT_KEYS},
+                "moves": [{"id": "tackle", "pp": 35, "pp_max": 35}], "status": {"name": None, "counter": 0}
+            })
+        for item in range(ITEMS_PER_USER):
+            data["bags"].append({"owner_id": user_id, "id": f"item-{item}", "name": "Item", "category": "items", "quantity": 1})
+
+    return data
+
+def _measure(path: Path, user_ids: List[str]) -> tuple:
+    Database.reset_instance()
+
+    started = time.perf_counter()
+    db = Database(str(path))
+    users = UserRepository(db)
+    users.get(user_ids[0])
+    first_access = (time.perf_counter() - started) * 1000
+
+    timings = []
+    for user_id in user_ids:
+        started = time.perf_counter()
+        users.add_money(user_id, 1)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    Database.reset_instance()
+    return first_access, statistics.median(timings)
+
+def run() -> None:
+    print(f"{'users':>8} {'layout':12} {'open+1st read ms':>17} {'save p50 ms':>12}")
+
+    for count in USER_COUNTS:
+        data = build_dataset(count)
+        user_ids = random.Random(0).sample(list(data["users"]), ROUNDS)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            monolithic = Path(tmp) / "database.json"
+            monolithic.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            sharded = Path(tmp) / "database"
+            migrate(monolithic, sharded)
+            del data
+
+            layouts = {"monolithic": monolithic, "sharded": sharded}
+            for label, path in layouts.items():
+                first_access, save = _measure(path, user_ids)
+                print(f"{count:>8} {label:12} {first_access:17.1f} {save:12.2f}")
+
+if __name__ == "__main__":
+    run()
@@ -2,6 +2,7 @@ import discord
 import asyncio
 from typing import List, Dict, Final, Set
 from sdk.toolkit import Toolkit
+from sdk.async_toolkit import AsyncToolkit
 from discord.ext import commands
 from helpers.flags import flags
 from sdk.items.constants import ITEM_EMOJIS
@@ -20,6 +21,7 @@ class Bag(commands.Cog, name="Mochila"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.tk: Toolkit = Toolkit()
+        self.storage: AsyncToolkit = AsyncToolkit()
 
     def _get_needed_files(self, bag_items: List[Dict]) -> List[discord.File]:
         categories: Set[str] = {item['category'] for item in bag_items}
@@ -35,7 +37,7 @@ class Bag(commands.Cog, name="Mochila"):
         await ctx.defer()
         
         user_id: str = str(ctx.author.id)
-        bag_items = self.tk.bag.get_all(user_id)
+        bag_items = await self.storage.bag.get_all(user_id)
         
         files = self._get_needed_files(bag_items)
         view = BagItemsLayout(bag_items, tk=self.tk)
@@ -48,7 +50,7 @@ class Bag(commands.Cog, name="Mochila"):
         user_id: str = str(ctx.author.id)
 
         try:
-            result = self.tk.item_service.give(user_id, item_id, quantity)
+            result = await self.storage.item_service.give(user_id, item_id, quantity)
             emoji = ITEM_EMOJIS.get(result['id'], '❔')
             await ctx.reply(
                 f"Adicionado {emoji} **{result['name']}** {result['added']}x a sua mochila, contendo **{result['quantity']}x** no total."
@@ -62,7 +64,7 @@ class Bag(commands.Cog, name="Mochila"):
         user_id: str = str(ctx.author.id)
 
         try:
-            result_quantity = self.tk.bag.remove(user_id, item_id, quantity)
+            result_quantity = await self.storage.bag.remove(user_id, item_id, quantity)
             item_name = self.tk.item_service.get_name(item_id)
             emoji = ITEM_EMOJIS.get(item_id, '❔')
             await ctx.reply(
@@ -1,5 +1,6 @@
 import io
 import time
+import asyncio
 import textwrap
 import traceback
 import sys
@@ -8,12 +9,18 @@ import discord
 from discord.ext import commands
 from PIL import Image
 from sdk.toolkit import Toolkit
+from helpers.metrics import format_summary
+from helpers.profiling import profilers, ProfilerBusy, PROFILER_KINDS, OFFLOADED_KINDS, DEFAULT_TOP
+from sdk.backups import BackupBusy
 
 class Dev(commands.Cog):
     hidden = True
     
+    MAX_PROFILE_WINDOW = 600
+    
     def __init__(self, bot):
         self.bot = bot
+        self._profile_tasks = {}
 
     @staticmethod
     def cleanup_code(content: str) -> str:
@@ -87,6 +94,89 @@ class Dev(commands.Cog):
         else:
             await ctx.send(f"```py\n{text}\n```", allowed_mentions=discord.AllowedMentions.none())
 
+    @commands.is_owner()
+    @commands.command(name="stats")
+    async def stats_command(self, ctx: commands.Context):
+        text = format_summary()
+        
+        if len(text) > 1900:
+            fp = io.BytesIO(text.encode("utf-8"))
+            await ctx.send(file=discord.File(fp, "stats.txt"))
+        else:
+            await ctx.send(f"```\n{text}\n```")
+
+    @commands.is_owner()
+    @commands.command(name="backup")
+    async def backup_command(self, ctx: commands.Context):
+        try:
+            backup = await asyncio.to_thread(self.bot.backups.run)
+        except BackupBusy as e:
+            return await ctx.send(str(e))
+        
+        await ctx.send(
+            f"Backup `{backup.path.name}` criado ({backup.size / 1048576:.1f} MiB) em {backup.duration:.1f}s, "
+            f"escritas pausadas por {backup.frozen * 1000:.0f} ms"
+        )
+
+    async def _send_profile(self, ctx: commands.Context, kind: str, limit: int = DEFAULT_TOP):
+        self._profile_tasks.pop(kind, None)
+        if kind in OFFLOADED_KINDS:
+            session = await asyncio.to_thread(profilers.stop, kind)
+        else:
+            session = profilers.stop(kind)
+        results = await asyncio.to_thread(session.results, limit)
+        files = [discord.File(io.BytesIO(data), name) for name, data in results.items()]
+        await ctx.send(f"Profiler `{kind}` finalizado", files=files)
+
+    async def _profile_window(self, ctx: commands.Context, kind: str, seconds: float):
+        await asyncio.sleep(seconds)
+        await self._send_profile(ctx, kind)
+
+    @commands.is_owner()
+    @commands.group(name="profile", aliases=["prof"], invoke_without_command=True)
+    async def profile_group(self, ctx: commands.Context):
+        active = profilers.active()
+        status = ", ".join(f"`{kind}`" for kind in active) if active else "nenhum"
+        await ctx.send(f"Profilers ativos: {status}\nTipos: {', '.join(PROFILER_KINDS)}")
+
+    @commands.is_owner()
+    @profile_group.command(name="start")
+    async def profile_start(self, ctx: commands.Context, kind: str = "sample", seconds: float = 0):
+        if not 0 <= seconds <= self.MAX_PROFILE_WINDOW:
+            return await ctx.send(f"Janela deve ser entre 0 e {self.MAX_PROFILE_WINDOW} segundos")
+        
+        try:
+            if kind in OFFLOADED_KINDS:
+                await asyncio.to_thread(profilers.start, kind)
+            else:
+                profilers.start(kind)
+        except (ValueError, ProfilerBusy) as e:
+            return await ctx.send(str(e))
+        
+        if seconds:
+            self._profile_tasks[kind] = asyncio.create_task(self._profile_window(ctx, kind, seconds))
+            await ctx.send(f"Profiler `{kind}` iniciado por {seconds:g}s")
+        else:
+            await ctx.send(f"Profiler `{kind}` iniciado, use `profile stop {kind}` para finalizar")
+
+    @commands.is_owner()
+    @profile_group.command(name="stop")
+    async def profile_stop(self, ctx: commands.Context, kind: str = "sample", top: int = DEFAULT_TOP):
+        if kind not in profilers.active():
+            return await ctx.send(f"Profiler `{kind}` não está em execução")
+        
+        task = self._profile_tasks.pop(kind, None)
+        if task is not None:
+            task.cancel()
+        
+        await self._send_profile(ctx, kind, max(1, min(top, 200)))
+
+    def cog_unload(self):
+        for task in self._profile_tasks.values():
+            task.cancel()
+        for kind in profilers.active():
+            profilers.stop(kind)
+
     @commands.is_owner()
     @commands.command(name="upscale", aliases=["up"])
     async def upscale_command(self, ctx: commands.Context, scale: int = 2):
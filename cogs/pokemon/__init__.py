@@ -1,14 +1,19 @@
 import discord
 import asyncio
-from typing import List, Optional, Dict, Final
+from pathlib import Path
+from typing import Optional, Dict, Final
 from discord.ext import commands
 from helpers.flags import flags
 from cogs.pokemon.filters import apply_filters, apply_sort_limit
 from cogs.pokemon.views import PokemonListLayout, PokemonInfoLayout
+from cogs.pokemon.analysis import summarize_counts
 from sdk.toolkit import Toolkit
+from sdk.async_toolkit import AsyncToolkit
 from utilities.formatting import format_pokemon_display
-from utilities.preloaded import preloaded_info_backgrounds
-from utilities.canvas import compose_pokemon_async
+from utilities.preloaded import has_resource
+from utilities.canvas import compose_pokemon_async, RenderOverloaded
+from utilities.media_cache import media_cache
+from helpers.metrics import phase
 import helpers.checks as checks
 
 class Pokemon(commands.Cog, name="Pokémon"):
@@ -23,9 +28,10 @@ class Pokemon(commands.Cog, name="Pokémon"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.tk = Toolkit()
-
-    def _get_static_files(self) -> List[discord.File]:
-        return [discord.File(path, f"{name}.png") for name, path in self.STATIC_ICONS.items()]
+        self.storage = AsyncToolkit()
+        self._static_icons: Dict[str, bytes] = {
+            f"{name}.png": Path(path).read_bytes() for name, path in self.STATIC_ICONS.items()
+        }
 
     @flags.add_flag("--page", nargs="?", type=int, default=0)
     @flags.add_flag("--user", type=discord.Member, default=None)
@@ -198,19 +204,23 @@ class Pokemon(commands.Cog, name="Pokémon"):
     async def pokemon_command(self, ctx: commands.Context, **flags):
         user_id = str(ctx.author.id)
 
-        if flags.get("party") and not flags.get("box"):
-            pokemons = await asyncio.to_thread(self.tk.pokemon.get_party, user_id)
-        elif flags.get("box") and not flags.get("party"):
-            pokemons = await asyncio.to_thread(self.tk.pokemon.get_box, user_id)
-        else:
-            pokemons = await asyncio.to_thread(self.tk.pokemon.get_all_by_owner, user_id)
+        with phase("db_read"):
+            if flags.get("party") and not flags.get("box"):
+                pokemons = await self.storage.pokemon.get_party(user_id)
+            elif flags.get("box") and not flags.get("party"):
+                pokemons = await self.storage.pokemon.get_box(user_id)
+            else:
+                pokemons = await self.storage.pokemon.get_all_by_owner(user_id)
 
-        pokemons = await asyncio.to_thread(apply_filters, pokemons, flags)
-        pokemons = await asyncio.to_thread(apply_sort_limit, pokemons, flags)
+        with phase("filter_sort"):
+            pokemons = await asyncio.to_thread(apply_filters, pokemons, flags)
+            pokemons = await asyncio.to_thread(apply_sort_limit, pokemons, flags)
 
         page_size = max(1, flags.get("page_size", 20))
         view = PokemonListLayout(pokemons, flags.get("page", 0), page_size)
-        await ctx.reply(view=view)
+        
+        with phase("upload"):
+            await ctx.reply(view=view)
 
     @commands.command(name="favorite", aliases=["fav"])
     @checks.require_account()
@@ -218,7 +228,7 @@ class Pokemon(commands.Cog, name="Pokémon"):
         user_id = str(ctx.author.id)
         
         try:
-            pokemon, was_fav = await asyncio.to_thread(self._toggle_favorite_safe, user_id, pokemon_id, True)
+            pokemon, was_fav = await self.storage.write(self._toggle_favorite_safe, user_id, pokemon_id, True)
             if was_fav:
                 await ctx.reply(f"{format_pokemon_display(pokemon, bold_name=True)} já está nos favoritos!")
             else:
@@ -232,7 +242,7 @@ class Pokemon(commands.Cog, name="Pokémon"):
         user_id = str(ctx.author.id)
 
         try:
-            pokemon, was_fav = await asyncio.to_thread(self._toggle_favorite_safe, user_id, pokemon_id, False)
+            pokemon, was_fav = await self.storage.write(self._toggle_favorite_safe, user_id, pokemon_id, False)
             if not was_fav:
                 await ctx.reply(f"{format_pokemon_display(pokemon, bold_name=True)} já não está nos favoritos!")
             else:
@@ -240,15 +250,16 @@ class Pokemon(commands.Cog, name="Pokémon"):
         except ValueError:
             await ctx.reply("Pokémon não encontrado.")
 
-    def _toggle_favorite_safe(self, user_id: str, pokemon_id: int, should_be_fav: bool):
-        pokemon = self.tk.pokemon.get(user_id, pokemon_id)
+    @staticmethod
+    def _toggle_favorite_safe(tk: Toolkit, user_id: str, pokemon_id: int, should_be_fav: bool):
+        pokemon = tk.pokemon.get(user_id, pokemon_id)
         was_fav = pokemon.get("is_favorite", False)
         
         if should_be_fav and not was_fav:
-            self.tk.pokemon.toggle_favorite(user_id, pokemon_id)
+            tk.pokemon.toggle_favorite(user_id, pokemon_id)
             pokemon["is_favorite"] = True
         elif not should_be_fav and was_fav:
-            self.tk.pokemon.toggle_favorite(user_id, pokemon_id)
+            tk.pokemon.toggle_favorite(user_id, pokemon_id)
             pokemon["is_favorite"] = False
         
         return pokemon, was_fav
@@ -264,7 +275,7 @@ class Pokemon(commands.Cog, name="Pokémon"):
         user_id = str(ctx.author.id)
         
         try:
-            pokemon = await asyncio.to_thread(self._set_nickname_and_get, user_id, pokemon_id, nickname)
+            pokemon = await self.storage.pokemon.set_nickname(user_id, pokemon_id, nickname)
             
             if nickname:
                 await ctx.reply(f"Nickname definido como **{nickname}** para o {format_pokemon_display(pokemon, bold_name=True, show_nick=False)}!")
@@ -273,10 +284,26 @@ class Pokemon(commands.Cog, name="Pokémon"):
         except ValueError:
             await ctx.reply("Pokémon não encontrado.")
 
-    def _set_nickname_and_get(self, user_id: str, pokemon_id: int, nickname: Optional[str]):
-        self.tk.pokemon.set_nickname(user_id, pokemon_id, nickname)
-        pokemon = self.tk.pokemon.get(user_id, pokemon_id)
-        return pokemon
+    @commands.command(name="collection", aliases=["col"])
+    @checks.require_account()
+    async def collection_command(self, ctx: commands.Context) -> None:
+        user_id = str(ctx.author.id)
+
+        with phase("db_read"):
+            counts = await self.storage.pokemon.count_collection(user_id)
+            pokedex = await self.storage.pokemon.get_pokedex(user_id)
+
+        summary = summarize_counts(counts)
+        regions = " · ".join(f"{region} {r['caught']}/{r['total']}" for region, r in pokedex["regions"].items())
+
+        await ctx.reply(
+            f"### Coleção de {ctx.author.display_name}\n"
+            f"**Total:** {counts['total']} (party {counts['party']}, box {counts['box']})\n"
+            f"**Shiny:** {summary['shiny']} · **Favoritos:** {summary['favorite']} · **Raros:** {summary['rare']} · **Evento:** {summary['event']}\n"
+            f"**IV:** 80-89% {summary['iv_80_90']} · 90-99% {summary['iv_90_100']} · 100% {summary['iv_100']}\n"
+            f"**Pokédex:** {pokedex['caught']}/{pokedex['total']} capturados ({pokedex['completion']}%), {pokedex['seen']} vistos\n"
+            f"-# {regions}"
+        )
 
     @commands.cooldown(3, 5, commands.BucketType.user)
     @commands.command(name="info", aliases=["i", "inf"])
@@ -286,42 +313,55 @@ class Pokemon(commands.Cog, name="Pokémon"):
         
         user_id = str(ctx.author.id)
 
-        if pokemon_id is None:
-            party = self.tk.pokemon.get_party(user_id)
-            
-            if not party:
-                all_pokemons = self.tk.pokemon.get_all_by_owner(user_id)
-                if not all_pokemons:
-                    await ctx.reply("Você não possuí nenhum Pokémon.")
-                    return
-                current_pokemon = all_pokemons[0]
-                pokemon_index = 0
-            else:
-                current_pokemon = party[0]
-                all_pokemons = self.tk.pokemon.get_all_by_owner(user_id)
-                pokemon_index = next((i for i, p in enumerate(all_pokemons) if p['id'] == current_pokemon['id']), 0)
-        else:
+        with phase("db_read"):
             try:
-                current_pokemon = self.tk.pokemon.get(user_id, pokemon_id)
-                all_pokemons = self.tk.pokemon.get_all_by_owner(user_id)
-                pokemon_index = next((i for i, p in enumerate(all_pokemons) if p['id'] == pokemon_id), 0)
+                selected = await self.storage.read(self._select_info_pokemon, user_id, pokemon_id)
             except ValueError:
                 await ctx.reply("Você não possuí um Pokémon com esse ID.")
                 return
+        
+        if selected is None:
+            await ctx.reply("Você não possuí nenhum Pokémon.")
+            return
+        
+        current_pokemon, pokemon_index, all_pokemons = selected
 
         sprite_url = self.tk.api.get_pokemon_sprite(current_pokemon)[0]
-        background = preloaded_info_backgrounds.get(current_pokemon["background"])
+        sprite_key = self.tk.api.get_sprite_key(current_pokemon)
+        background = f"info:{current_pokemon['background']}"
         
-        if not background:
+        if not has_resource(background):
             await ctx.reply("Background não encontrado.")
             return
         
-        composed_bytes = await compose_pokemon_async(sprite_url, background)
+        try:
+            with phase("render"):
+                composed_bytes = await compose_pokemon_async(sprite_url, background, sprite_key=sprite_key)
+        except RenderOverloaded:
+            await ctx.reply("Estou gerando muitas imagens agora, tente novamente em alguns segundos.")
+            return
+
+        media = media_cache.prepare({**self._static_icons, "pokemon.png": composed_bytes.getvalue()})
+        view = PokemonInfoLayout(current_pokemon, pokemon_index, len(all_pokemons), self.tk, media=media.refs)
+        
+        with phase("upload"):
+            message = await ctx.reply(view=view, files=media.files)
+        media_cache.commit(media, message)
 
-        files = self._get_static_files() + [discord.File(composed_bytes, "pokemon.png")]
-        view = PokemonInfoLayout(current_pokemon, pokemon_index, len(all_pokemons), self.tk)
+    @staticmethod
+    def _select_info_pokemon(tk: Toolkit, user_id: str, pokemon_id: Optional[int]):
+        all_pokemons = tk.pokemon.get_all_by_owner(user_id)
+        
+        if pokemon_id is not None:
+            current_pokemon = tk.pokemon.get(user_id, pokemon_id)
+        else:
+            if not all_pokemons:
+                return None
+            party = tk.pokemon.get_party(user_id)
+            current_pokemon = party[0] if party else all_pokemons[0]
         
-        await ctx.reply(view=view, files=files)
+        pokemon_index = next((i for i, p in enumerate(all_pokemons) if p['id'] == current_pokemon['id']), 0)
+        return current_pokemon, pokemon_index, all_pokemons
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Pokemon(bot))
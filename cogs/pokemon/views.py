@@ -3,7 +3,7 @@ from sdk.calculations import iv_percent, calculate_stats
 from sdk.constants import STAT_KEYS, STAT_LABELS
 from sdk.items.constants import ITEM_EMOJIS
 from utilities.formatting import format_pokemon_display, format_happiness_status, format_nature_info, format_item_display
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from sdk.toolkit import Toolkit
 
@@ -80,13 +80,14 @@ class PokemonListLayout(discord.ui.LayoutView):
             await interaction.response.edit_message(view=self)
 
 class PokemonInfoLayout(discord.ui.LayoutView):
-    def __init__(self, current_pokemon: Dict, current_index: int, total_pages: int, tk: Toolkit):
+    def __init__(self, current_pokemon: Dict, current_index: int, total_pages: int, tk: Toolkit, media: Optional[Dict[str, str]] = None):
         super().__init__()
         self.current_pokemon = current_pokemon
         self.current_index = current_index
         self.total_pages = total_pages
         self.tk = tk
         self.show_iv = True
+        self._media_refs = media or {}
         
         self._stat_keys = STAT_KEYS
         self._stat_labels = STAT_LABELS
@@ -147,6 +148,9 @@ class PokemonInfoLayout(discord.ui.LayoutView):
         pokemon_data = self.tk.api.get_pokemon(self._species_id)
         self._future_moves = self.tk.api.get_future_moves(pokemon_data, level)
 
+    def _media(self, filename: str) -> str:
+        return self._media_refs.get(filename, f"attachment://{filename}")
+
     def _build(self):
         self.clear_items()
         
@@ -164,7 +168,7 @@ class PokemonInfoLayout(discord.ui.LayoutView):
 
         c.add_item(self._separator)
         
-        sec = discord.ui.Section(accessory=discord.ui.Thumbnail("attachment://stats.png"))
+        sec = discord.ui.Section(accessory=discord.ui.Thumbnail(self._media("stats.png")))
         sec.add_item(TextDisplay(
             f"-# **Especificações**\n"
             f"<:CometShard:1424200074463805551> **Experiência:** {p.get('exp', 0)}/{self._exp_next} | Próximo: {self._exp_needed} XP ({self._exp_progress}%)\n"
@@ -201,7 +205,7 @@ class PokemonInfoLayout(discord.ui.LayoutView):
                 else:
                     stats_lines.append(f"<:stats:1424204552910929920> **{stat_labels[key]}:** {final} | Base: {b} | IV: {iv}")
             
-            sec = discord.ui.Section(accessory=discord.ui.Thumbnail("attachment://iv.png"))
+            sec = discord.ui.Section(accessory=discord.ui.Thumbnail(self._media("iv.png")))
             self._toggle_btn.label = "Mostrar EVs"
         else:
             evs = self._evs
@@ -217,7 +221,7 @@ class PokemonInfoLayout(discord.ui.LayoutView):
                 else:
                     stats_lines.append(f"<:stats:1424204552910929920> **{stat_labels[key]}:** {final} | Base: {b} | EV: {ev}")
             
-            sec = discord.ui.Section(accessory=discord.ui.Thumbnail("attachment://ev.png"))
+            sec = discord.ui.Section(accessory=discord.ui.Thumbnail(self._media("ev.png")))
             self._toggle_btn.label = "Mostrar IVs"
 
         sec.add_item(TextDisplay(f"-# **Estatísticas**\n{chr(10).join(stats_lines)}"))
@@ -228,12 +232,12 @@ class PokemonInfoLayout(discord.ui.LayoutView):
         c.add_item(row)
         c.add_item(self._separator)
 
-        sec = discord.ui.Section(accessory=discord.ui.Thumbnail("attachment://special_move.png"))
+        sec = discord.ui.Section(accessory=discord.ui.Thumbnail(self._media("special_move.png")))
         sec.add_item(TextDisplay(f"-# **Seus Movimentos**\n{chr(10).join(self._moves_data)}"))
         c.add_item(sec)
         
         c.add_item(self._separator)
-        c.add_item(discord.ui.MediaGallery(discord.MediaGalleryItem("attachment://pokemon.png")))
+        c.add_item(discord.ui.MediaGallery(discord.MediaGalleryItem(self._media("pokemon.png"))))
         c.add_item(self._separator)
         c.add_item(TextDisplay(f"-# Capturado em: {self._caught_at}"))
 
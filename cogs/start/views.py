@@ -187,14 +187,9 @@ class TimezoneSelect(discord.ui.Select):
         selected_timezone = self.values[0]
         selected_gender = self.view.selected_gender
 
-        from sdk.database import Database
-        from sdk.repositories.user_repository import UserRepository
+        from sdk.async_toolkit import AsyncToolkit
 
-        db = Database()
-        user_repo = UserRepository(db)
-
-        await asyncio.to_thread(
-            user_repo.create,
+        await AsyncToolkit().users.create(
             user_id=user_id,
             gender=selected_gender,
             timezone=selected_timezone
@@ -1,4 +1,6 @@
 import discord
+import asyncio
+import time
 import os
 from pathlib import Path
 from typing import Optional
@@ -7,8 +9,19 @@ from core.config import Config
 from core.events import EventHandler
 from core.errors import ErrorHandler
 from core.help import CustomHelpCommand
-from utilities.pokemon_emojis import load_application_emojis
-from utilities.preloaded import preload_backgrounds, preload_info_backgrounds, preload_textures, preload_textures_arena
+from core.startup import startup_profiler
+from helpers.metrics import metrics, command_trace, finish_command, start_metrics_server
+from helpers.watchdog import loop_watchdog
+from sdk.api.services import APIService
+from sdk.async_toolkit import AsyncToolkit
+from sdk.backups import BackupManager
+from sdk.database import LOCK_STRIPES
+from utilities.pokemon_emojis import load_application_emojis, load_cached_emojis
+from utilities.preloaded import resource_manager
+from utilities.canvas import render_scheduler, render_cache, cache_stats, warm_sprite_cache, info_layout
+from utilities.media_cache import media_cache
+
+RESIDENCY_INTERVAL = 60
 
 class PokemonBot(commands.Bot):
 	def __init__(self, config: Config):
@@ -25,12 +38,108 @@ class PokemonBot(commands.Bot):
 		self.config = config
 		self.event_handler = EventHandler(self)
 		self.error_handler = ErrorHandler(self)
+		self._deferred_startup: Optional[asyncio.Task] = None
+		self._metrics_server: Optional[asyncio.AbstractServer] = None
+		self._residency_task: Optional[asyncio.Task] = None
+		self._storage_load_task: Optional[asyncio.Task] = None
+		self._backup_task: Optional[asyncio.Task] = None
+		self._audit_task: Optional[asyncio.Task] = None
+		self.backups: Optional[BackupManager] = None
 	
 	async def setup_hook(self) -> None:
-		await self._load_extensions()
-		await self._preload_resources()
+		with startup_profiler.phase("configure"):
+			render_scheduler.configure(
+				self.config.render_workers,
+				self.config.render_queue_limit,
+				self.config.render_processes
+			)
+			render_cache.configure_disk(self.config.render_disk_mb * 1024 * 1024 or None)
+			resource_manager.configure(
+				self.config.resource_memory_mb * 1024 * 1024 or None,
+				self.config.resource_workers
+			)
+		
+		self._register_metrics()
+		if self.config.loop_block_threshold_ms:
+			loop_watchdog.threshold = self.config.loop_block_threshold_ms / 1000
+			loop_watchdog.start()
+		if self.config.metrics_port:
+			self._metrics_server = await start_metrics_server(self.config.metrics_host, self.config.metrics_port)
+			print(f"Métricas disponíveis em http://{self.config.metrics_host}:{self.config.metrics_port}/metrics")
+		
+		with startup_profiler.phase("storage"):
+			storage = AsyncToolkit(self.config.database_path)
+			storage.tk.db.set_codec(self.config.storage_codec)
+			if storage.tk.db.sharded and (self.config.storage_idle_ttl or self.config.storage_memory_mb):
+				self._residency_task = asyncio.create_task(self._run_residency(storage))
+			if not storage.tk.db.ready:
+				self._storage_load_task = asyncio.create_task(self._wait_storage(storage))
+			self.backups = BackupManager(storage.tk.db, Path(self.config.backup_dir), self.config.backup_keep)
+			if self.config.backup_interval:
+				self._backup_task = asyncio.create_task(self._run_backups())
+			if self.config.counter_audit_interval:
+				self._audit_task = asyncio.create_task(self._run_counter_audit(storage))
+		
+		with startup_profiler.phase("emoji cache"):
+			load_cached_emojis(self.application_id)
+		
+		with startup_profiler.phase("extensions"):
+			await self._load_extensions()
+		
+		if self.config.fast_boot:
+			self._deferred_startup = asyncio.create_task(self._run_deferred_startup())
+		else:
+			await self._preload_resources()
+	
+	async def close(self) -> None:
+		loop_watchdog.stop()
+		if self._residency_task is not None:
+			self._residency_task.cancel()
+		if self._backup_task is not None:
+			self._backup_task.cancel()
+		if self._audit_task is not None:
+			self._audit_task.cancel()
+		if self._metrics_server is not None:
+			self._metrics_server.close()
+			self._metrics_server = None
+		await super().close()
+		await asyncio.to_thread(AsyncToolkit().close)
+		render_scheduler.shutdown()
+	
+	async def invoke(self, ctx: commands.Context) -> None:
+		if ctx.command is None:
+			return await super().invoke(ctx)
+		
+		with command_trace(ctx.command.qualified_name) as trace:
+			try:
+				await super().invoke(ctx)
+			finally:
+				finish_command(trace, ctx.command_failed)
+	
+	def _register_metrics(self) -> None:
+		metrics.gauge(
+			"cache_hit_ratio",
+			lambda: {
+				**{name: stats["hit_rate"] for name, stats in cache_stats().items() if "hit_rate" in stats},
+				"media": media_cache.stats()["hit_rate"],
+			},
+			help="Hit ratio per cache",
+			label="cache"
+		)
+		metrics.gauge(
+			"cache_bytes",
+			lambda: {name: stats["bytes"] for name, stats in cache_stats().items() if "bytes" in stats},
+			help="Bytes held per in-memory cache",
+			label="cache"
+		)
+		metrics.gauge("render_pending", lambda: render_scheduler.stats()["pending"], help="Render jobs running or queued")
+		metrics.gauge("gateway_latency_seconds", lambda: self.latency, help="Discord gateway heartbeat latency")
+		metrics.gauge("storage_resident_users", lambda: len(AsyncToolkit().tk.db.get("users")), help="Users resident in memory")
+		metrics.gauge("storage_resident_bytes", lambda: AsyncToolkit().tk.db.resident_bytes(), help="Serialized size of resident storage shards")
 	
 	async def on_ready(self) -> None:
+		if startup_profiler.finish():
+			print(startup_profiler.report())
 		await self.event_handler.on_ready()
 		await self._set_activity()
 	
@@ -84,9 +193,81 @@ class PokemonBot(commands.Bot):
 		except Exception as e:
 			print(f"Falha ao carregar {module}: {e}")
 	
-	async def _preload_resources(self) -> None:
-		await load_application_emojis(self)
-		preload_backgrounds()
-		preload_info_backgrounds()
-		preload_textures()
-		preload_textures_arena()
+	async def _preload_resources(self, deferred: bool = False) -> None:
+		with startup_profiler.phase("emojis", deferred):
+			await load_application_emojis(self)
+		
+		with startup_profiler.phase("datasets", deferred):
+			await asyncio.to_thread(APIService.warm_up)
+		
+		with startup_profiler.phase("resources", deferred):
+			await resource_manager.preload_async()
+		
+		with startup_profiler.phase("render cache", deferred):
+			await asyncio.to_thread(render_cache.prune_disk)
+		
+		# Render processes keep their own sprite caches, so warming only pays off for thread workers.
+		if self.config.warm_sprites and not self.config.render_processes:
+			with startup_profiler.phase("sprites", deferred):
+				fronts = ((key, data) for key, data in AsyncToolkit().api.iter_sprites() if key.orientation == "front")
+				warmed = await asyncio.to_thread(warm_sprite_cache, fronts, (info_layout(),))
+				print(f"{warmed} sprites pré-processados")
+	
+	async def _wait_storage(self, storage: AsyncToolkit) -> None:
+		started = time.perf_counter()
+		await asyncio.to_thread(storage.tk.db.wait_ready)
+		print(f"Banco de dados carregado em segundo plano em {(time.perf_counter() - started) * 1000:.0f} ms")
+	
+	async def _run_residency(self, storage: AsyncToolkit) -> None:
+		# A zero TTL disables idle eviction, leaving only the memory budget.
+		ttl = self.config.storage_idle_ttl or float("inf")
+		budget = self.config.storage_memory_mb * 1024 * 1024 or None
+		
+		while True:
+			await asyncio.sleep(max(1, min(RESIDENCY_INTERVAL, ttl / 2)))
+			try:
+				evicted = await storage.evict(ttl, budget)
+			except Exception as e:
+				print(f"Falha ao descarregar usuários inativos: {e}")
+				continue
+			
+			if evicted:
+				print(f"{evicted} shards inativos descarregados da memória")
+	
+	async def _run_backups(self) -> None:
+		while True:
+			await asyncio.sleep(self.config.backup_interval)
+			try:
+				backup = await asyncio.to_thread(self.backups.run)
+			except Exception as e:
+				print(f"Falha ao criar backup: {e}")
+				continue
+			
+			print(f"Backup {backup.path.name} criado em {backup.duration:.1f}s (escritas pausadas por {backup.frozen * 1000:.0f} ms)")
+	
+	async def _run_counter_audit(self, storage: AsyncToolkit) -> None:
+		while True:
+			await asyncio.sleep(self.config.counter_audit_interval)
+			try:
+				# One stripe per worker call, so each pass only holds back writes to that stripe's users.
+				mismatched = []
+				for stripe in range(LOCK_STRIPES):
+					mismatched += await asyncio.to_thread(storage.tk.pokemon.verify_counters, stripe)
+			except Exception as e:
+				print(f"Falha ao verificar contadores da coleção: {e}")
+				continue
+			
+			if mismatched:
+				metrics.inc("pokemon_counter_mismatches_total", len(mismatched), help="Owners whose collection counters drifted from a full recount")
+				print(f"Contadores da coleção corrigidos para {len(mismatched)} usuários")
+	
+	async def _run_deferred_startup(self) -> None:
+		await self.wait_until_ready()
+		
+		try:
+			await self._preload_resources(deferred=True)
+		except Exception as e:
+			print(f"Falha no carregamento adiado: {e}")
+			return
+		
+		print(f"Carregamento adiado concluído em {sum(p.duration or 0 for p in startup_profiler.phases if p.deferred) * 1000:.0f} ms")
@@ -5,14 +5,60 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _env_bool(name: str, default: bool = False) -> bool:
+	value = os.getenv(name)
+	if value is None:
+		return default
+	return value.strip().lower() in ("1", "true", "yes", "on")
+
 @dataclass(frozen=True)
 class Config:
 	token: str
 	prefix: str = "."
+	database_path: str = "database.json"
+	storage_codec: str = "json"
+	storage_idle_ttl: int = 1800
+	storage_memory_mb: int = 0
+	backup_dir: str = "backups"
+	backup_interval: int = 0
+	backup_keep: int = 7
+	counter_audit_interval: int = 3600
+	render_workers: int = 2
+	render_queue_limit: int = 32
+	render_processes: bool = False
+	render_disk_mb: int = 256
+	resource_memory_mb: int = 0
+	resource_workers: int = 4
+	warm_sprites: bool = False
+	fast_boot: bool = False
+	metrics_host: str = "127.0.0.1"
+	metrics_port: int = 0
+	loop_block_threshold_ms: int = 250
 	
 	@classmethod
 	def from_env(cls) -> "Config":
 		token: Optional[str] = os.getenv("DISCORD_TOKEN")
 		if not token:
 			raise ValueError("DISCORD_TOKEN not found in environment")
-		return cls(token=token)
\ No newline at end of file
+		return cls(
+			token=token,
+			database_path=os.getenv("DATABASE_PATH", cls.database_path),
+			storage_codec=os.getenv("STORAGE_CODEC", cls.storage_codec),
+			storage_idle_ttl=int(os.getenv("STORAGE_IDLE_TTL", cls.storage_idle_ttl)),
+			storage_memory_mb=int(os.getenv("STORAGE_MEMORY_MB", cls.storage_memory_mb)),
+			backup_dir=os.getenv("BACKUP_DIR", cls.backup_dir),
+			backup_interval=int(os.getenv("BACKUP_INTERVAL", cls.backup_interval)),
+			backup_keep=int(os.getenv("BACKUP_KEEP", cls.backup_keep)),
+			counter_audit_interval=int(os.getenv("COUNTER_AUDIT_INTERVAL", cls.counter_audit_interval)),
+			render_workers=int(os.getenv("RENDER_WORKERS", cls.render_workers)),
+			render_queue_limit=int(os.getenv("RENDER_QUEUE_LIMIT", cls.render_queue_limit)),
+			render_processes=_env_bool("RENDER_PROCESSES", cls.render_processes),
+			render_disk_mb=int(os.getenv("RENDER_DISK_MB", cls.render_disk_mb)),
+			resource_memory_mb=int(os.getenv("RESOURCE_MEMORY_MB", cls.resource_memory_mb)),
+			resource_workers=int(os.getenv("RESOURCE_WORKERS", cls.resource_workers)),
+			warm_sprites=_env_bool("WARM_SPRITES", cls.warm_sprites),
+			fast_boot=_env_bool("FAST_BOOT", cls.fast_boot),
+			metrics_host=os.getenv("METRICS_HOST", cls.metrics_host),
+			metrics_port=int(os.getenv("METRICS_PORT", cls.metrics_port)),
+			loop_block_threshold_ms=int(os.getenv("LOOP_BLOCK_THRESHOLD_MS", cls.loop_block_threshold_ms))
+		)
\ No newline at end of file
@@ -0,0 +1,167 @@
+import sys
+import time
+import threading
+import importlib.abc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+@dataclass
+class PhaseTiming:
+	name: str
+	started: float
+	duration: Optional[float] = None
+	deferred: bool = False
+
+@dataclass
+class ImportTiming:
+	module: str
+	total: float = 0.0
+	self_time: float = 0.0
+	children: float = field(default=0.0, repr=False)
+
+class _TimedLoader(importlib.abc.Loader):
+	def __init__(self, loader: importlib.abc.Loader, finder: "ImportTimer"):
+		self._loader = loader
+		self._finder = finder
+	
+	def __getattr__(self, name: str):
+		return getattr(self._loader, name)
+	
+	def create_module(self, spec):
+		return self._loader.create_module(spec)
+	
+	def exec_module(self, module) -> None:
+		with self._finder.measure(module.__name__):
+			self._loader.exec_module(module)
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+	def __init__(self):
+		self.timings: Dict[str, ImportTiming] = {}
+		self._local = threading.local()
+		self._finding = threading.local()
+	
+	def install(self) -> None:
+		if self not in sys.meta_path:
+			sys.meta_path.insert(0, self)
+	
+	def uninstall(self) -> None:
+		if self in sys.meta_path:
+			sys.meta_path.remove(self)
+	
+	def find_spec(self, fullname, path, target=None):
+		if getattr(self._finding, "active", False):
+			return None
+		
+		self._finding.active = True
+		try:
+			for finder in sys.meta_path:
+				if finder is self or not hasattr(finder, "find_spec"):
+					continue
+				spec = finder.find_spec(fullname, path, target)
+				if spec is not None:
+					break
+			else:
+				return None
+		finally:
+			self._finding.active = False
+		
+		if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+			spec.loader = _TimedLoader(spec.loader, self)
+		return spec
+	
+	@contextmanager
+	def measure(self, module: str) -> Iterator[None]:
+		stack: List[ImportTiming] = getattr(self._local, "stack", None)
+		if stack is None:
+			stack = self._local.stack = []
+		
+		timing = ImportTiming(module)
+		stack.append(timing)
+		started = time.perf_counter()
+		try:
+			yield
+		finally:
+			timing.total = time.perf_counter() - started
+			timing.self_time = timing.total - timing.children
+			stack.pop()
+			if stack:
+				stack[-1].children += timing.total
+			self.timings[module] = timing
+	
+	def top(self, limit: int = 15) -> List[ImportTiming]:
+		return sorted(self.timings.values(), key=lambda t: t.self_time, reverse=True)[:limit]
+
+class StartupProfiler:
+	def __init__(self):
+		self.started = time.perf_counter()
+		self.finished: Optional[float] = None
+		self.phases: List[PhaseTiming] = []
+		self.imports = ImportTimer()
+	
+	def start(self, track_imports: bool = True) -> None:
+		self.started = time.perf_counter()
+		if track_imports:
+			self.imports.install()
+	
+	@contextmanager
+	def phase(self, name: str, deferred: bool = False) -> Iterator[PhaseTiming]:
+		timing = PhaseTiming(name, time.perf_counter(), deferred=deferred)
+		self.phases.append(timing)
+		try:
+			yield timing
+		finally:
+			timing.duration = time.perf_counter() - timing.started
+	
+	def finish(self) -> bool:
+		if self.finished is not None:
+			return False
+		self.finished = time.perf_counter()
+		self.imports.uninstall()
+		return True
+	
+	@property
+	def time_to_ready(self) -> Optional[float]:
+		if self.finished is None:
+			return None
+		return self.finished - self.started
+	
+	def summary(self) -> dict:
+		return {
+			"time_to_ready": self.time_to_ready,
+			"phases": [
+				{
+					"name": p.name,
+					"offset": p.started - self.started,
+					"duration": p.duration,
+					"deferred": p.deferred,
+				}
+				for p in self.phases
+			],
+			"imports": [
+				{"module": t.module, "self": t.self_time, "total": t.total}
+				for t in self.imports.top()
+			],
+		}
+	
+	def report(self, import_limit: int = 15) -> str:
+		lines = []
+		
+		if self.time_to_ready is not None:
+			lines.append(f"Pronto em {self.time_to_ready * 1000:.0f} ms")
+		
+		lines.append("Fases:")
+		for p in self.phases:
+			duration = f"{p.duration * 1000:8.1f} ms" if p.duration is not None else "   em andamento"
+			offset = (p.started - self.started) * 1000
+			suffix = " (adiada)" if p.deferred else ""
+			lines.append(f"  {p.name:<24}{duration}  @ {offset:8.1f} ms{suffix}")
+		
+		if self.imports.timings:
+			lines.append("Imports (self / total):")
+			for t in self.imports.top(import_limit):
+				lines.append(f"  {t.module:<40}{t.self_time * 1000:8.1f} ms {t.total * 1000:8.1f} ms")
+		
+		return "\n".join(lines)
+
+startup_profiler = StartupProfiler()
@@ -1,15 +1,15 @@
 from functools import wraps
 from discord.ext import commands
-from sdk.toolkit import Toolkit
+from sdk.async_toolkit import AsyncToolkit
 
 def require_no_account():
 	def decorator(func):
 		@wraps(func)
 		async def wrapper(self, ctx: commands, *args, **kwargs):
-			tk: Toolkit = Toolkit()
+			tk: AsyncToolkit = AsyncToolkit()
 
 			user_id: str = str(ctx.author.id)
-			user = tk.users.get(user_id)
+			user = await tk.users.get(user_id)
 			if user:
 				await ctx.send(f"Esse comando só pode ser usado por quem não tem conta.")
 				return
@@ -22,10 +22,10 @@ def require_account():
 	def decorator(func):
 		@wraps(func)
 		async def wrapper(self, ctx: commands, *args, **kwargs):
-			tk: Toolkit = Toolkit()
+			tk: AsyncToolkit = AsyncToolkit()
 
 			user_id: str = str(ctx.author.id)
-			user = tk.users.get(user_id)
+			user = await tk.users.get(user_id)
 			if not user:
 				await ctx.send(f"Você ainda não tem uma conta!\nUse `.start` para começar sua jornada Pokémon!")
 				return
@@ -0,0 +1,289 @@
+import time
+import asyncio
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Final, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS: Final[Tuple[float, ...]] = (
+	0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+SIZE_BUCKETS: Final[Tuple[float, ...]] = tuple(float(1 << n) for n in range(10, 31, 2))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+	if not labels:
+		return ()
+	return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+	items = list(labels)
+	if extra is not None:
+		items.append(extra)
+	if not items:
+		return ""
+	body = ",".join(f'{k}="{v}"' for k, v in items)
+	return f"{{{body}}}"
+
+def _format_value(value: float) -> str:
+	if value == float("inf"):
+		return "+Inf"
+	return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Histogram:
+	__slots__ = ("buckets", "counts", "sum", "count", "_lock")
+	
+	def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+		self.buckets = buckets
+		self.counts = [0] * (len(buckets) + 1)
+		self.sum = 0.0
+		self.count = 0
+		self._lock = threading.Lock()
+	
+	def observe(self, value: float) -> None:
+		index = bisect.bisect_left(self.buckets, value)
+		with self._lock:
+			self.counts[index] += 1
+			self.sum += value
+			self.count += 1
+	
+	def quantile(self, q: float) -> float:
+		with self._lock:
+			if not self.count:
+				return 0.0
+			rank = q * self.count
+			seen = 0
+			for index, bucket_count in enumerate(self.counts):
+				seen += bucket_count
+				if seen >= rank:
+					return self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+		return self.buckets[-1]
+	
+	def cumulative(self) -> List[Tuple[float, int]]:
+		with self._lock:
+			result = []
+			total = 0
+			for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+				total += bucket_count
+				result.append((bound, total))
+			return result
+
+@dataclass
+class _Family:
+	kind: str
+	help: str
+	buckets: Tuple[float, ...] = LATENCY_BUCKETS
+	series: Dict[Labels, object] = field(default_factory=dict)
+
+class MetricsRegistry:
+	def __init__(self):
+		self._families: Dict[str, _Family] = {}
+		self._gauges: Dict[str, Tuple[str, Callable[[], Dict[Labels, float]]]] = {}
+		self._lock = threading.Lock()
+	
+	def _family(self, name: str, kind: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> _Family:
+		family = self._families.get(name)
+		if family is None:
+			with self._lock:
+				family = self._families.setdefault(name, _Family(kind, help, buckets))
+		return family
+	
+	def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None, help: str = "", buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+		family = self._family(name, "histogram", help, buckets)
+		key = _labels(labels)
+		histogram = family.series.get(key)
+		if histogram is None:
+			with self._lock:
+				histogram = family.series.setdefault(key, Histogram(family.buckets))
+		histogram.observe(value)
+	
+	def inc(self, name: str, amount: float = 1, labels: Optional[Dict[str, str]] = None, help: str = "") -> None:
+		family = self._family(name, "counter", help)
+		key = _labels(labels)
+		with self._lock:
+			family.series[key] = family.series.get(key, 0) + amount
+	
+	def gauge(self, name: str, func: Callable[[], object], help: str = "", label: Optional[str] = None) -> None:
+		def collect() -> Dict[Labels, float]:
+			value = func()
+			if label is not None:
+				return {((label, str(k)),): v for k, v in value.items()}
+			return {(): value}
+		
+		self._gauges[name] = (help, collect)
+	
+	def histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[Histogram]:
+		family = self._families.get(name)
+		if family is None:
+			return None
+		return family.series.get(_labels(labels))
+	
+	def series(self, name: str) -> Dict[Labels, object]:
+		family = self._families.get(name)
+		return dict(family.series) if family else {}
+	
+	def collect_gauges(self) -> Dict[str, Dict[Labels, float]]:
+		result = {}
+		for name, (_, collect) in list(self._gauges.items()):
+			try:
+				result[name] = collect()
+			except Exception:
+				continue
+		return result
+	
+	def render_prometheus(self) -> str:
+		lines = []
+		
+		for name, family in sorted(self._families.items()):
+			if family.help:
+				lines.append(f"# HELP {name} {family.help}")
+			lines.append(f"# TYPE {name} {family.kind}")
+			
+			for labels, value in sorted(family.series.items()):
+				if family.kind == "counter":
+					lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+					continue
+				
+				for bound, total in value.cumulative():
+					lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {total}")
+				lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value.sum)}")
+				lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+		
+		gauges = self.collect_gauges()
+		for name, values in sorted(gauges.items()):
+			help = self._gauges[name][0]
+			if help:
+				lines.append(f"# HELP {name} {help}")
+			lines.append(f"# TYPE {name} gauge")
+			for labels, value in sorted(values.items()):
+				lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+		
+		return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+@dataclass
+class CommandTrace:
+	command: str
+	started: float = field(default_factory=time.perf_counter)
+	phases: Dict[str, float] = field(default_factory=dict)
+
+_current_trace: contextvars.ContextVar[Optional[CommandTrace]] = contextvars.ContextVar("command_trace", default=None)
+
+def current_command() -> Optional[str]:
+	trace = _current_trace.get()
+	return trace.command if trace else None
+
+@contextmanager
+def command_trace(command: str) -> Iterator[CommandTrace]:
+	trace = CommandTrace(command)
+	token = _current_trace.set(trace)
+	try:
+		yield trace
+	finally:
+		_current_trace.reset(token)
+
+def finish_command(trace: CommandTrace, failed: bool) -> float:
+	elapsed = time.perf_counter() - trace.started
+	metrics.observe(
+		"command_latency_seconds",
+		elapsed,
+		{"command": trace.command, "status": "error" if failed else "ok"},
+		help="End-to-end command latency"
+	)
+	return elapsed
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		elapsed = time.perf_counter() - started
+		trace = _current_trace.get()
+		command = trace.command if trace else "none"
+		if trace is not None:
+			trace.phases[name] = trace.phases.get(name, 0.0) + elapsed
+		metrics.observe(
+			"command_phase_seconds",
+			elapsed,
+			{"command": command, "phase": name},
+			help="Time spent per command phase"
+		)
+
+def _histogram_line(label: str, histogram: Histogram, scale: float = 1000.0, unit: str = "ms") -> str:
+	mean = histogram.sum / histogram.count if histogram.count else 0.0
+	return (
+		f"{label:<28}{histogram.count:>7}"
+		f"{mean * scale:>10.1f}{histogram.quantile(0.5) * scale:>10.1f}{histogram.quantile(0.95) * scale:>10.1f} {unit}"
+	)
+
+def format_summary() -> str:
+	lines = [f"{'comando':<28}{'n':>7}{'média':>10}{'p50':>10}{'p95':>10}"]
+	
+	commands = metrics.series("command_latency_seconds")
+	phases = metrics.series("command_phase_seconds")
+	
+	for labels, histogram in sorted(commands.items()):
+		values = dict(labels)
+		lines.append(_histogram_line(f"{values['command']} [{values['status']}]", histogram))
+		for phase_labels, phase_histogram in sorted(phases.items()):
+			phase_values = dict(phase_labels)
+			if phase_values["command"] == values["command"] and values["status"] == "ok":
+				lines.append(_histogram_line(f"  {phase_values['phase']}", phase_histogram))
+	
+	extras = (
+		("db save", "db_save_seconds", 1000.0, "ms"),
+		("db save size", "db_save_bytes", 1 / 1024, "KiB"),
+		("render queue wait", "render_queue_wait_seconds", 1000.0, "ms"),
+		("event loop lag", "event_loop_lag_seconds", 1000.0, "ms"),
+	)
+	for label, name, scale, unit in extras:
+		histogram = metrics.histogram(name)
+		if histogram is not None and histogram.count:
+			lines.append(_histogram_line(label, histogram, scale, unit))
+	
+	for labels, histogram in sorted(metrics.series("event_loop_block_seconds").items()):
+		lines.append(_histogram_line(f"loop block [{dict(labels)['command']}]", histogram))
+	
+	for name, values in sorted(metrics.collect_gauges().items()):
+		for labels, value in sorted(values.items()):
+			suffix = ",".join(v for _, v in labels)
+			label = f"{name}[{suffix}]" if suffix else name
+			lines.append(f"{label:<38}{value:>12.3f}")
+	
+	return "\n".join(lines)
+
+async def _handle_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+	try:
+		request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+		while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+			pass
+		
+		parts = request_line.decode("latin-1").split()
+		path = parts[1] if len(parts) > 1 else "/"
+		
+		if path.split("?")[0] == "/metrics":
+			body = metrics.render_prometheus().encode()
+			status = "200 OK"
+			content_type = "text/plain; version=0.0.4; charset=utf-8"
+		else:
+			body = b"not found\n"
+			status = "404 Not Found"
+			content_type = "text/plain"
+		
+		writer.write(
+			f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+			+ body
+		)
+		await writer.drain()
+	except (asyncio.TimeoutError, ConnectionError):
+		pass
+	finally:
+		writer.close()
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+	return await asyncio.start_server(_handle_http, host, port)
@@ -0,0 +1,232 @@
+import io
+import sys
+import time
+import pstats
+import marshal
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, Final, FrozenSet, List, Optional, Tuple
+
+DEFAULT_SAMPLE_INTERVAL: Final[float] = 0.005
+DEFAULT_TOP: Final[int] = 30
+MAX_STACK_DEPTH: Final[int] = 128
+
+class ProfilerBusy(RuntimeError):
+	pass
+
+def _frame_label(frame) -> str:
+	code = frame.f_code
+	return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+class StackSampler:
+	def __init__(self, thread_id: Optional[int] = None, interval: float = DEFAULT_SAMPLE_INTERVAL):
+		self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+		self.interval = interval
+		self.stacks: Counter = Counter()
+		self.samples = 0
+		self.started = 0.0
+		self.elapsed = 0.0
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+	
+	def start(self) -> None:
+		self.started = time.perf_counter()
+		self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+		self._thread.start()
+	
+	def _run(self) -> None:
+		while not self._stop.wait(self.interval):
+			frame = sys._current_frames().get(self.thread_id)
+			if frame is None:
+				continue
+			
+			stack = []
+			while frame is not None and len(stack) < MAX_STACK_DEPTH:
+				stack.append(_frame_label(frame))
+				frame = frame.f_back
+			
+			self.stacks[";".join(reversed(stack))] += 1
+			self.samples += 1
+	
+	def stop(self) -> None:
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join()
+		self.elapsed = time.perf_counter() - self.started
+	
+	def collapsed(self) -> str:
+		return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+	
+	def top(self, limit: int = DEFAULT_TOP) -> str:
+		own: Counter = Counter()
+		total: Counter = Counter()
+		
+		for stack, count in self.stacks.items():
+			frames = stack.split(";")
+			own[frames[-1]] += count
+			for name in set(frames):
+				total[name] += count
+		
+		samples = max(1, self.samples)
+		lines = [
+			f"{self.samples} amostras em {self.elapsed:.1f}s (intervalo {self.interval * 1000:.1f} ms)",
+			f"{'own%':>7} {'total%':>7}  função",
+		]
+		for name, count in own.most_common(limit):
+			lines.append(f"{count * 100 / samples:>6.1f}% {total[name] * 100 / samples:>6.1f}%  {name}")
+		
+		return "\n".join(lines) + "\n"
+	
+	def results(self, limit: int = DEFAULT_TOP) -> Dict[str, bytes]:
+		return {
+			"sample_top.txt": self.top(limit).encode(),
+			"sample.collapsed": self.collapsed().encode(),
+		}
+
+class CPUProfile:
+	def __init__(self):
+		self.profile = cProfile.Profile()
+		self.started = 0.0
+		self.elapsed = 0.0
+	
+	def start(self) -> None:
+		self.started = time.perf_counter()
+		self.profile.enable()
+	
+	def stop(self) -> None:
+		self.profile.disable()
+		self.elapsed = time.perf_counter() - self.started
+	
+	def call_edges(self, stats: pstats.Stats) -> str:
+		# cProfile only records caller/callee pairs, not whole stacks, so this is a weighted call graph
+		# ("caller;callee usec"), not a collapsed-stack file a flamegraph tool could render.
+		lines = []
+		
+		for func, (_, _, tottime, _, callers) in stats.stats.items():
+			label = f"{func[2]} ({func[0].rsplit('/', 1)[-1]}:{func[1]})"
+			
+			if not callers:
+				lines.append(f"{label} {int(tottime * 1_000_000)}")
+				continue
+			
+			for caller, (_, _, caller_tottime, _) in callers.items():
+				caller_label = f"{caller[2]} ({caller[0].rsplit('/', 1)[-1]}:{caller[1]})"
+				lines.append(f"{caller_label};{label} {int(caller_tottime * 1_000_000)}")
+		
+		return "\n".join(line for line in lines if not line.endswith(" 0")) + "\n"
+	
+	def top(self, stats: pstats.Stats, limit: int = DEFAULT_TOP) -> str:
+		out = io.StringIO()
+		out.write(f"Janela de {self.elapsed:.1f}s\n")
+		
+		stats.stream = out
+		stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+		stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+		return out.getvalue()
+	
+	def results(self, limit: int = DEFAULT_TOP) -> Dict[str, bytes]:
+		# pstats.Stats takes ownership of the profile's stats dict, so everything is
+		# derived from one instance; strip_dirs() runs last because it rewrites keys.
+		stats = pstats.Stats(self.profile)
+		raw = marshal.dumps(stats.stats)
+		edges = self.call_edges(stats)
+		return {
+			"cpu_top.txt": self.top(stats, limit).encode(),
+			"cpu_edges.txt": edges.encode(),
+			"cpu.pstats": raw,
+		}
+
+class MemoryWindow:
+	def __init__(self, frames: int = 16):
+		self.frames = frames
+		self.started_tracing = False
+		self.baseline: Optional[tracemalloc.Snapshot] = None
+		self.snapshot: Optional[tracemalloc.Snapshot] = None
+		self.started = 0.0
+		self.elapsed = 0.0
+	
+	def start(self) -> None:
+		if not tracemalloc.is_tracing():
+			tracemalloc.start(self.frames)
+			self.started_tracing = True
+		self.started = time.perf_counter()
+		self.baseline = tracemalloc.take_snapshot()
+	
+	def stop(self) -> None:
+		self.snapshot = tracemalloc.take_snapshot()
+		self.elapsed = time.perf_counter() - self.started
+		if self.started_tracing:
+			tracemalloc.stop()
+	
+	def top(self, limit: int = DEFAULT_TOP) -> str:
+		filters = [
+			tracemalloc.Filter(False, tracemalloc.__file__),
+			tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+		]
+		current = self.snapshot.filter_traces(filters)
+		baseline = self.baseline.filter_traces(filters)
+		
+		lines = [f"Janela de {self.elapsed:.1f}s", "", "Maiores variações:"]
+		for stat in current.compare_to(baseline, "lineno")[:limit]:
+			lines.append(f"{stat.size_diff / 1024:>+10.1f} KiB {stat.count_diff:>+8}  {stat.traceback}")
+		
+		lines += ["", "Maiores alocações atuais:"]
+		for stat in current.statistics("lineno")[:limit]:
+			lines.append(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8}  {stat.traceback}")
+		
+		return "\n".join(lines) + "\n"
+	
+	def collapsed(self) -> str:
+		lines = []
+		for stat in self.snapshot.statistics("traceback"):
+			frames = [f"{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}" for frame in reversed(stat.traceback)]
+			lines.append(f"{';'.join(frames)} {stat.size}")
+		return "\n".join(lines) + "\n"
+	
+	def results(self, limit: int = DEFAULT_TOP) -> Dict[str, bytes]:
+		return {
+			"memory_top.txt": self.top(limit).encode(),
+			"memory.collapsed": self.collapsed().encode(),
+		}
+
+PROFILER_KINDS: Final[Tuple[str, ...]] = ("sample", "cpu", "memory")
+# tracemalloc snapshots walk every traced block and can take seconds on a large heap, so these kinds are
+# started and stopped off the event loop; cProfile and the sampler bind to the calling thread and cannot be.
+OFFLOADED_KINDS: Final[FrozenSet[str]] = frozenset({"memory"})
+
+class ProfilerManager:
+	def __init__(self):
+		self._sessions: Dict[str, object] = {}
+	
+	def active(self) -> List[str]:
+		return list(self._sessions)
+	
+	def start(self, kind: str, thread_id: Optional[int] = None, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+		if kind not in PROFILER_KINDS:
+			raise ValueError(f"Tipo de profiler desconhecido: {kind}")
+		if kind in self._sessions:
+			raise ProfilerBusy(f"Profiler {kind} já está em execução")
+		
+		if kind == "sample":
+			session = StackSampler(thread_id, interval)
+		elif kind == "cpu":
+			session = CPUProfile()
+		else:
+			session = MemoryWindow()
+		
+		session.start()
+		self._sessions[kind] = session
+	
+	def stop(self, kind: str):
+		# cProfile is bound to the thread that enabled it, so stop() must run on the
+		# profiled thread; formatting the returned session's results() can be offloaded.
+		session = self._sessions.pop(kind, None)
+		if session is None:
+			raise KeyError(kind)
+		
+		session.stop()
+		return session
+
+profilers = ProfilerManager()
@@ -0,0 +1,124 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from types import FrameType
+from typing import Deque, Final, List, Optional
+from helpers.metrics import metrics
+
+DEFAULT_THRESHOLD: Final[float] = 0.25
+HEARTBEAT_INTERVAL: Final[float] = 0.05
+MAX_STACK_DEPTH: Final[int] = 64
+RECENT_BLOCKS: Final[int] = 20
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BlockReport:
+	command: str
+	detected_at: float
+	stack: List[str]
+	duration: Optional[float] = None
+
+def _command_from_stack(frame: Optional[FrameType]) -> str:
+	# Command callbacks and Bot.invoke all receive a commands.Context named ctx;
+	# the innermost one on the blocked stack is the command holding the loop.
+	while frame is not None:
+		ctx = frame.f_locals.get("ctx")
+		command = getattr(ctx, "command", None)
+		name = getattr(command, "qualified_name", None)
+		if name:
+			return name
+		frame = frame.f_back
+	return "none"
+
+class LoopWatchdog:
+	def __init__(self, threshold: float = DEFAULT_THRESHOLD, interval: float = HEARTBEAT_INTERVAL):
+		self.threshold = threshold
+		self.interval = interval
+		self.recent: Deque[BlockReport] = deque(maxlen=RECENT_BLOCKS)
+		self._beat = 0.0
+		self._pending: Optional[BlockReport] = None
+		self._loop_thread: Optional[int] = None
+		self._task: Optional[asyncio.Task] = None
+		self._thread: Optional[threading.Thread] = None
+		self._stop = threading.Event()
+	
+	@property
+	def running(self) -> bool:
+		return self._task is not None
+	
+	def start(self) -> None:
+		if self._task is not None:
+			return
+		
+		self._loop_thread = threading.get_ident()
+		self._beat = time.perf_counter()
+		self._stop.clear()
+		self._task = asyncio.create_task(self._heartbeat())
+		self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+		self._thread.start()
+	
+	def stop(self) -> None:
+		self._stop.set()
+		if self._task is not None:
+			self._task.cancel()
+			self._task = None
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+	
+	async def _heartbeat(self) -> None:
+		while True:
+			expected = time.perf_counter() + self.interval
+			await asyncio.sleep(self.interval)
+			now = time.perf_counter()
+			
+			metrics.observe("event_loop_lag_seconds", max(0.0, now - expected), help="Event loop scheduling lag")
+			self._beat = now
+			
+			report = self._pending
+			if report is not None:
+				self._pending = None
+				self._finish(report, now - expected + self.interval)
+	
+	def _finish(self, report: BlockReport, duration: float) -> None:
+		report.duration = duration
+		metrics.inc("event_loop_blocks_total", labels={"command": report.command}, help="Event loop blocks over the threshold")
+		metrics.observe("event_loop_block_seconds", duration, {"command": report.command}, help="Duration of event loop blocks")
+		logger.warning("Event loop bloqueado por %.0f ms (comando: %s)", duration * 1000, report.command)
+	
+	def _watch(self) -> None:
+		reported = 0.0
+		
+		while not self._stop.wait(min(self.interval, self.threshold / 4)):
+			beat = self._beat
+			if beat == reported or time.perf_counter() - beat < self.threshold:
+				continue
+			
+			frame = sys._current_frames().get(self._loop_thread)
+			if frame is None:
+				continue
+			
+			command = _command_from_stack(frame)
+			if self._beat != beat:
+				continue
+			
+			reported = beat
+			report = BlockReport(
+				command,
+				time.time(),
+				traceback.format_stack(frame, MAX_STACK_DEPTH)
+			)
+			self.recent.append(report)
+			self._pending = report
+			logger.warning(
+				"Event loop bloqueado há mais de %.0f ms (comando: %s)\n%s",
+				self.threshold * 1000, report.command, "".join(report.stack)
+			)
+
+loop_watchdog = LoopWatchdog()
@@ -1,7 +1,12 @@
 import asyncio
 import logging
 import sys
-from core.bot import PokemonBot
+from core.startup import startup_profiler
+
+startup_profiler.start()
+
+with startup_profiler.phase("imports"):
+	from core.bot import PokemonBot
 from core.config import Config
 
 logging.basicConfig(
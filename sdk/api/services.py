@@ -1,8 +1,9 @@
 import orjson
 from pathlib import Path
-from typing import Optional, Union, TypeAlias
+from typing import Iterator, Optional, Union, TypeAlias
 from dataclasses import dataclass
 from functools import lru_cache
+from sdk.api.sprites import SpriteAtlas, SpriteKey, SpriteManifest, SpriteVariant
 import logging
 
 Identifier: TypeAlias = Union[str, int]
@@ -18,26 +19,9 @@ class DataPaths:
     LOCATION_AREA: Path = BASE / "location-area.json"
     EVOLUTION_CHAIN: Path = BASE / "evolution-chain.json"
     SPRITES: Path = BASE / "sprites"
+    SPRITE_ATLAS: Path = BASE / "sprites.atlas"
 
-@dataclass(frozen=True)
-class SpriteVariant:
-    orientation: str
-    shiny: bool
-    gender: Optional[str] = None
-    
-    def generate_filenames(self, pokemon_id: int) -> tuple[str, ...]:
-        id_str = str(pokemon_id).zfill(3)
-        base = f"{id_str}_{self.orientation}"
-        
-        if self.gender == "female":
-            if self.shiny:
-                return (f"{base}_shiny_female.png", f"{base}_shiny.png", f"{base}_default.png")
-            return (f"{base}_female.png", f"{base}_default.png")
-        
-        if self.shiny:
-            return (f"{base}_shiny.png", f"{base}_default.png")
-        
-        return (f"{base}_default.png",)
+WARM_DATASETS: tuple[Path, ...] = (DataPaths.POKEMON, DataPaths.SPECIES, DataPaths.MOVES, DataPaths.ITEMS)
 
 class APIService:
     DEFAULT_PP = 35
@@ -46,6 +30,12 @@ class APIService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self._sprites_base = DataPaths.SPRITES
+        self._sprite_atlas = SpriteAtlas.open(DataPaths.SPRITE_ATLAS)
+        
+        if self._sprite_atlas is not None:
+            self._sprite_manifest = SpriteManifest(self._sprite_atlas.filenames())
+        else:
+            self._sprite_manifest = SpriteManifest.scan(self._sprites_base)
     
     @staticmethod
     @lru_cache(maxsize=4)
@@ -72,36 +62,41 @@ class APIService:
         
         return id_index, name_index
     
-    @lru_cache(maxsize=1024)
-    def _find_sprite_path(self, pokemon_id: int, orientation: str, is_shiny: bool, gender: Optional[str]) -> Optional[str]:
-        variant = SpriteVariant(orientation, is_shiny, gender if gender == "female" else None)
-        
-        for filename in variant.generate_filenames(pokemon_id):
-            sprite_path = self._sprites_base / filename
-            if sprite_path.exists():
-                return str(sprite_path)
-        
-        return None
-
+    @classmethod
+    def warm_up(cls, paths: tuple[Path, ...] = WARM_DATASETS) -> int:
+        for path in paths:
+            cls._parse_and_index(str(path))
+        return len(paths)
+    
     @lru_cache(maxsize=512)
-    def _load_sprite_bytes(self, sprite_path: str) -> bytes:
-        return Path(sprite_path).read_bytes()
+    def _load_sprite_bytes(self, filename: str) -> bytes:
+        if self._sprite_atlas is not None:
+            data = self._sprite_atlas.read(filename)
+            if data is not None:
+                return data
+        
+        return (self._sprites_base / filename).read_bytes()
     
-    def get_pokemon_sprite(self, poke: dict) -> tuple[Optional[bytes], Optional[bytes]]:
-        pokemon_id = int(poke["species_id"])
+    def get_sprite_key(self, poke: dict, orientation: str = "front") -> SpriteKey:
         gender = poke.get("gender", "").lower() if poke.get("gender") else None
-        is_shiny = poke.get("is_shiny", False)
-        
-        gender_key = gender if gender == "female" else None
+        return SpriteKey(int(poke["species_id"]), orientation, bool(poke.get("is_shiny", False)), gender == "female")
+    
+    def get_pokemon_sprite(self, poke: dict) -> tuple[Optional[bytes], Optional[bytes]]:
+        front_key = self.get_sprite_key(poke, "front")
+        back_key = self.get_sprite_key(poke, "back")
         
-        front_path = self._find_sprite_path(pokemon_id, "front", is_shiny, gender_key)
-        back_path = self._find_sprite_path(pokemon_id, "back", is_shiny, gender_key)
+        front_path = self._sprite_manifest.resolve(front_key)
+        back_path = self._sprite_manifest.resolve(back_key)
         
         front_bytes = self._load_sprite_bytes(front_path) if front_path else None
         back_bytes = self._load_sprite_bytes(back_path) if back_path else None
         
         return (front_bytes, back_bytes)
     
+    def iter_sprites(self) -> Iterator[tuple[SpriteKey, bytes]]:
+        for key in self._sprite_manifest.keys():
+            yield key, self._load_sprite_bytes(self._sprite_manifest.resolve(key))
+    
     def get_pokemon(self, identifier: Identifier) -> Optional[dict]:
         id_index, name_index = self._parse_and_index(str(DataPaths.POKEMON))
         
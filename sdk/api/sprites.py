@@ -0,0 +1,151 @@
+import os
+import mmap
+import struct
+import orjson
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Final, Iterable, NamedTuple, Optional
+
+ATLAS_MAGIC: Final[bytes] = b"SDXATL01"
+ATLAS_HEADER: Final[struct.Struct] = struct.Struct("<8sI")
+ORIENTATIONS: Final[tuple[str, ...]] = ("front", "back")
+
+class SpriteKey(NamedTuple):
+    species_id: int
+    orientation: str
+    shiny: bool
+    female: bool
+
+@dataclass(frozen=True)
+class SpriteVariant:
+    orientation: str
+    shiny: bool
+    gender: Optional[str] = None
+
+    def generate_filenames(self, pokemon_id: int) -> tuple[str, ...]:
+        id_str = str(pokemon_id).zfill(3)
+        base = f"{id_str}_{self.orientation}"
+
+        if self.gender == "female":
+            if self.shiny:
+                return (f"{base}_shiny_female.png", f"{base}_shiny.png", f"{base}_default.png")
+            return (f"{base}_female.png", f"{base}_default.png")
+
+        if self.shiny:
+            return (f"{base}_shiny.png", f"{base}_default.png")
+
+        return (f"{base}_default.png",)
+
+class SpriteManifest:
+    __slots__ = ("_entries",)
+
+    def __init__(self, filenames: Iterable[str]):
+        available = set(filenames)
+        species_ids = {
+            int(name[:3])
+            for name in available
+            if name.endswith(".png") and name[:3].isdigit()
+        }
+
+        self._entries: dict[SpriteKey, str] = {}
+
+        for species_id in species_ids:
+            for orientation in ORIENTATIONS:
+                for shiny in (False, True):
+                    for female in (False, True):
+                        variant = SpriteVariant(orientation, shiny, "female" if female else None)
+                        filename = next(
+                            (f for f in variant.generate_filenames(species_id) if f in available),
+                            None
+                        )
+                        if filename:
+                            self._entries[SpriteKey(species_id, orientation, shiny, female)] = filename
+
+    @classmethod
+    def scan(cls, base: Path) -> "SpriteManifest":
+        if not base.is_dir():
+            return cls(())
+        return cls(os.listdir(base))
+
+    def resolve(self, key: SpriteKey) -> Optional[str]:
+        return self._entries.get(key)
+
+    def keys(self) -> list[SpriteKey]:
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SpriteAtlas:
+    __slots__ = ("path", "_map", "_index", "_data_start")
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            # The mapping keeps its own reference to the file, so the handle is never held open.
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, index_len = ATLAS_HEADER.unpack_from(self._map, 0)
+            if magic != ATLAS_MAGIC:
+                raise ValueError(f"Invalid sprite atlas: {self.path}")
+
+            index_start = ATLAS_HEADER.size
+            self._data_start = index_start + index_len
+            self._index: dict[str, tuple[int, int]] = {
+                name: (offset, length)
+                for name, (offset, length) in orjson.loads(self._map[index_start:self._data_start]).items()
+            }
+        except (struct.error, ValueError, TypeError, AttributeError) as e:
+            self._map.close()
+            raise ValueError(f"Invalid sprite atlas: {self.path}") from e
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["SpriteAtlas"]:
+        try:
+            return cls(path)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def build(sprites_dir: Path, path: Path) -> int:
+        names = sorted(n for n in os.listdir(sprites_dir) if n.endswith(".png"))
+        blobs = [(sprites_dir / n).read_bytes() for n in names]
+
+        index = {}
+        offset = 0
+        for name, blob in zip(names, blobs):
+            index[name] = (offset, len(blob))
+            offset += len(blob)
+
+        index_bytes = orjson.dumps(index)
+        tmp_path = Path(path).with_suffix(".tmp")
+
+        with open(tmp_path, "wb") as f:
+            f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, len(index_bytes)))
+            f.write(index_bytes)
+            for blob in blobs:
+                f.write(blob)
+
+        tmp_path.replace(path)
+        return len(names)
+
+    def filenames(self) -> list[str]:
+        return list(self._index)
+
+    def read(self, filename: str) -> Optional[bytes]:
+        entry = self._index.get(filename)
+        if entry is None:
+            return None
+
+        start = self._data_start + entry[0]
+        return self._map[start:start + entry[1]]
+
+    def close(self) -> None:
+        self._map.close()
+
+if __name__ == "__main__":
+    from sdk.api.services import DataPaths
+
+    count = SpriteAtlas.build(DataPaths.SPRITES, DataPaths.SPRITE_ATLAS)
+    print(f"Atlas gerado com {count} sprites em {DataPaths.SPRITE_ATLAS}")
@@ -0,0 +1,228 @@
+import time
+import queue
+import asyncio
+import inspect
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Final, FrozenSet, List, Optional, Tuple
+from sdk.toolkit import Toolkit
+from helpers.metrics import metrics
+
+WRITE_BATCH_LIMIT: Final[int] = 64
+BATCH_BUCKETS: Final[Tuple[float, ...]] = (1, 2, 4, 8, 16, 32, 64)
+
+READ_METHODS: Final[Dict[str, FrozenSet[str]]] = {
+	"users": frozenset({"get", "exists", "get_timezone"}),
+	"pokemon": frozenset({
+		"get", "get_all_by_owner", "get_party", "get_box", "count_party", "can_add_to_party",
+		"get_favorites", "get_by_species", "get_shinies", "get_legendaries", "get_mythicals",
+		"has_caught_species", "has_seen_species", "get_pokedex", "search", "count_stats", "count_collection",
+		"has_move", "is_evolution_blocked"
+	}),
+	"bag": frozenset({
+		"get_all", "get_quantity", "has_item", "get_by_category", "count_total_items",
+		"count_unique_items", "is_empty", "get_item_info", "can_add"
+	}),
+	"item_service": frozenset({"get", "get_name", "get_cost", "get_attributes", "is_holdable", "is_consumable"}),
+}
+USER_PARAMS: Final[FrozenSet[str]] = frozenset({"user_id", "owner_id", "from_user_id", "to_user_id", "new_owner_id"})
+
+logger = logging.getLogger(__name__)
+
+Job = Tuple[Callable[..., Any], tuple, dict, asyncio.AbstractEventLoop, asyncio.Future]
+
+@lru_cache(maxsize=None)
+def _signature(func: Callable[..., Any]) -> inspect.Signature:
+	return inspect.signature(func)
+
+def _user_ids(func: Callable[..., Any], args: tuple, kwargs: dict) -> Tuple[str, ...]:
+	arguments = _signature(func).bind_partial(*args, **kwargs).arguments
+	return tuple(value for key, value in arguments.items() if key in USER_PARAMS and value is not None)
+
+def _resolve(future: asyncio.Future, ok: bool, value: Any) -> None:
+	if future.cancelled():
+		return
+	if ok:
+		future.set_result(value)
+	else:
+		future.set_exception(value)
+
+class StorageWriter:
+	def __init__(self, toolkit: Toolkit):
+		self.toolkit = toolkit
+		self._queue: "queue.SimpleQueue[Optional[Job]]" = queue.SimpleQueue()
+		self._thread: Optional[threading.Thread] = None
+		self._start_lock = threading.Lock()
+	
+	def submit(self, func: Callable[..., Any], *args, **kwargs) -> asyncio.Future:
+		loop = asyncio.get_running_loop()
+		future = loop.create_future()
+		
+		if self._thread is None:
+			with self._start_lock:
+				if self._thread is None:
+					self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+					self._thread.start()
+		
+		self._queue.put((func, args, kwargs, loop, future))
+		return future
+	
+	def stop(self) -> None:
+		if self._thread is None:
+			return
+		
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+	
+	def _drain(self, first: Job) -> Tuple[List[Job], bool]:
+		batch = [first]
+		while len(batch) < WRITE_BATCH_LIMIT:
+			try:
+				job = self._queue.get_nowait()
+			except queue.Empty:
+				break
+			if job is None:
+				return batch, True
+			batch.append(job)
+		return batch, False
+	
+	def _run(self) -> None:
+		while True:
+			job = self._queue.get()
+			if job is None:
+				return
+			
+			batch, stopping = self._drain(job)
+			started = time.perf_counter()
+			results = []
+			
+			try:
+				with self.toolkit.db.batch():
+					for func, args, kwargs, loop, future in batch:
+						try:
+							results.append((loop, future, True, func(*args, **kwargs)))
+						except Exception as e:
+							results.append((loop, future, False, e))
+			except Exception as e:
+				logger.exception("Falha ao gravar lote de %d escritas", len(batch))
+				results = [(loop, future, False, e) for _, _, _, loop, future in batch]
+			
+			metrics.observe("storage_commit_seconds", time.perf_counter() - started, help="Storage writer batch commit duration")
+			metrics.observe("storage_write_batch", len(batch), help="Mutations committed per storage writer batch", buckets=BATCH_BUCKETS)
+			
+			for loop, future, ok, value in results:
+				try:
+					loop.call_soon_threadsafe(_resolve, future, ok, value)
+				except RuntimeError:
+					pass
+			
+			if stopping:
+				return
+
+class AsyncRepository:
+	__slots__ = ("_owner", "_name", "_reads")
+	
+	def __init__(self, owner: "AsyncToolkit", name: str):
+		self._owner = owner
+		self._name = name
+		self._reads = READ_METHODS[name]
+	
+	def __getattr__(self, method: str) -> Callable[..., Any]:
+		owner, name = self._owner, self._name
+		
+		target = getattr(getattr(owner.tk, name), method)
+		
+		if method in self._reads:
+			async def read(*args, **kwargs):
+				user_id = None
+				if name != "item_service":
+					user_id = args[0] if args else kwargs.get("user_id", kwargs.get("owner_id"))
+					await owner.ensure_user(user_id)
+				return await asyncio.to_thread(owner._read_locked, user_id, target, *args, **kwargs)
+			return read
+		
+		async def write(*args, **kwargs):
+			await owner.ensure_user(*_user_ids(target, args, kwargs))
+			return await owner._writer.submit(target, *args, **kwargs)
+		return write
+
+class AsyncToolkit:
+	__slots__ = ("tk", "api", "happiness", "factory", "users", "pokemon", "bag", "item_service", "_writer", "_initialized")
+	_instance = None
+	_instance_lock = threading.Lock()
+	
+	def __new__(cls, path: str = "database.json"):
+		if cls._instance is None:
+			with cls._instance_lock:
+				if cls._instance is None:
+					instance = super().__new__(cls)
+					object.__setattr__(instance, '_initialized', False)
+					cls._instance = instance
+		return cls._instance
+	
+	def __init__(self, path: str = "database.json"):
+		if self._initialized:
+			return
+		
+		self.tk = Toolkit(path)
+		self.api = self.tk.api
+		self.happiness = self.tk.happiness
+		self.factory = self.tk.factory
+		self._writer = StorageWriter(self.tk)
+		
+		self.users = AsyncRepository(self, "users")
+		self.pokemon = AsyncRepository(self, "pokemon")
+		self.bag = AsyncRepository(self, "bag")
+		self.item_service = AsyncRepository(self, "item_service")
+		
+		object.__setattr__(self, '_initialized', True)
+	
+	async def ensure_user(self, *user_ids: str) -> None:
+		# Waiting on a shard read or a streaming load happens off the writer so other writes keep flowing.
+		if not self.tk.db.touch(*user_ids):
+			await asyncio.to_thread(self.tk.db.ensure_user, *user_ids)
+	
+	def _read_locked(self, user_id: Optional[str], func: Callable[..., Any], *args, **kwargs) -> Any:
+		# Holding the user's stripe means a read sees none or all of an in-flight mutation of that user,
+		# while writes to every other user keep going. Repository reads hand back copies.
+		if user_id is None:
+			return func(*args, **kwargs)
+		with self.tk.db.user_lock(user_id):
+			return func(*args, **kwargs)
+	
+	async def read(self, func: Callable[..., Any], user_id: str, *args, **kwargs) -> Any:
+		await self.ensure_user(user_id)
+		return await asyncio.to_thread(self._read_locked, user_id, func, self.tk, user_id, *args, **kwargs)
+	
+	async def write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+		await self.ensure_user(*_user_ids(func, (self.tk, *args), kwargs))
+		return await self._writer.submit(func, self.tk, *args, **kwargs)
+	
+	async def evict(self, ttl: float, budget: Optional[int] = None) -> int:
+		return await self._writer.submit(self.tk.db.evict, ttl, budget)
+	
+	async def create_pokemon(self, owner_id: str, species_id: int, level: int = 5, **kwargs) -> dict:
+		await self.ensure_user(owner_id)
+		return await self._writer.submit(self.tk.create_pokemon, owner_id, species_id, level, **kwargs)
+	
+	def get_exp_for_level(self, growth_type: str, level: int) -> int:
+		return self.tk.get_exp_for_level(growth_type, level)
+	
+	def get_level_from_exp(self, growth_type: str, exp: int) -> int:
+		return self.tk.get_level_from_exp(growth_type, exp)
+	
+	def get_exp_progress(self, growth_type: str, current_exp: int) -> dict:
+		return self.tk.get_exp_progress(growth_type, current_exp)
+	
+	def close(self) -> None:
+		self._writer.stop()
+	
+	@classmethod
+	def reset_instance(cls):
+		with cls._instance_lock:
+			if cls._instance is not None:
+				cls._instance.close()
+				object.__setattr__(cls._instance, '_initialized', False)
+			cls._instance = None
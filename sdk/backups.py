@@ -0,0 +1,108 @@
+import gzip
+import shutil
+import tarfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Final, List
+from helpers.metrics import metrics, SIZE_BUCKETS
+from sdk.database import Database
+from sdk.codecs import GZIP_MAGIC, ZLIB_HEADERS
+
+BACKUP_KEEP: Final[int] = 7
+
+class BackupBusy(RuntimeError):
+	pass
+
+@dataclass
+class Backup:
+	path: Path
+	version: int
+	size: int
+	frozen: float
+	duration: float
+
+class BackupManager:
+	def __init__(self, db: Database, directory: Path, keep: int = BACKUP_KEEP):
+		self.db = db
+		self.directory = Path(directory)
+		self.keep = keep
+		self._running = threading.Lock()
+	
+	@property
+	def prefix(self) -> str:
+		return self.db.path.stem or self.db.path.name
+	
+	def backups(self) -> List[Path]:
+		if not self.directory.exists():
+			return []
+		paths = [path for path in self.directory.glob(f"{self.prefix}-*") if path.suffix != ".tmp"]
+		return sorted(paths, key=lambda path: (path.stat().st_mtime_ns, path.name))
+	
+	def run(self) -> Backup:
+		if not self._running.acquire(blocking=False):
+			raise BackupBusy("Backup já está em andamento")
+		
+		try:
+			return self._run()
+		finally:
+			self._running.release()
+	
+	def _run(self) -> Backup:
+		started = time.perf_counter()
+		staging = self.db.path.parent / f".{self.db.path.name}.backup"
+		shutil.rmtree(staging, ignore_errors=True)
+		
+		try:
+			# Staging sits next to the database so the freeze is a batch of hard links on the same filesystem.
+			version = self.db.freeze(staging)
+			frozen = time.perf_counter() - started
+			
+			self.directory.mkdir(parents=True, exist_ok=True)
+			stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+			path = self._write(staging, f"{self.prefix}-{stamp}-v{version}")
+		finally:
+			shutil.rmtree(staging, ignore_errors=True)
+		
+		self._rotate()
+		
+		backup = Backup(path, version, path.stat().st_size, frozen, time.perf_counter() - started)
+		metrics.observe("db_backup_freeze_seconds", backup.frozen, help="Time writes were held while freezing a backup")
+		metrics.observe("db_backup_seconds", backup.duration, help="Database backup duration")
+		metrics.observe("db_backup_bytes", backup.size, help="Database backup size", buckets=SIZE_BUCKETS)
+		return backup
+	
+	def _target(self, name: str, suffix: str) -> Path:
+		path = self.directory / f"{name}{suffix}"
+		sequence = 1
+		while path.exists() or path.with_suffix(".tmp").exists():
+			path = self.directory / f"{name}-{sequence}{suffix}"
+			sequence += 1
+		return path
+	
+	def _write(self, staging: Path, name: str) -> Path:
+		if self.db.sharded:
+			path = self._target(name, ".tar.gz")
+			tmp_path = path.with_suffix(".tmp")
+			with tarfile.open(tmp_path, "w:gz") as archive:
+				for file in sorted(staging.iterdir()):
+					archive.add(file, f"{self.db.path.name}/{file.name}")
+		else:
+			source = staging / self.db.path.name
+			with open(source, "rb") as f:
+				compressed = f.read(2) in (GZIP_MAGIC, *ZLIB_HEADERS)
+			
+			path = self._target(name, f"{self.db.path.suffix}{'' if compressed else '.gz'}")
+			tmp_path = path.with_suffix(".tmp")
+			with open(source, "rb") as src, (open(tmp_path, "wb") if compressed else gzip.open(tmp_path, "wb", 6)) as dst:
+				shutil.copyfileobj(src, dst, 1 << 20)
+		
+		tmp_path.replace(path)
+		return path
+	
+	def _rotate(self) -> None:
+		backups = self.backups()
+		for path in backups[:max(0, len(backups) - self.keep)]:
+			path.unlink(missing_ok=True)
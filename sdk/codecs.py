@@ -0,0 +1,204 @@
+import io
+import gc
+import gzip
+import zlib
+import struct
+import orjson
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Final, Iterator, List, Optional, Tuple
+
+RECORDS_MAGIC: Final[bytes] = b"SDXR\x02"
+UNGROUPED_RECORDS_MAGIC: Final[bytes] = b"SDXR\x01"
+NDJSON_HEADER: Final[bytes] = b'{"format":"sdx-ndjson","version":1}\n'
+GZIP_MAGIC: Final[bytes] = b"\x1f\x8b"
+ZLIB_HEADERS: Final[Tuple[bytes, ...]] = (b"\x78\x01", b"\x78\x5e", b"\x78\x9c", b"\x78\xda")
+RECORD_HEADER = struct.Struct("<cI")
+STREAM_CHUNK: Final[int] = 1 << 20
+
+FORMATS: Final[Tuple[str, ...]] = ("json-indent", "json", "records", "ndjson")
+STREAM_FORMATS: Final[Tuple[str, ...]] = ("records", "ndjson")
+COMPRESSIONS: Final[Tuple[str, ...]] = ("zlib", "gzip")
+DEFAULT_CODEC: Final[str] = "json"
+
+USER: Final[str] = "U"
+POKEMON: Final[str] = "P"
+BAG: Final[str] = "B"
+OTHER: Final[str] = "K"
+
+_LIST_KINDS: Final[Dict[str, str]] = {"pokemon": POKEMON, "bags": BAG}
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+	# Decoding allocates millions of containers; without this every allocation burst
+	# triggers full collections that rescan everything already loaded.
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+def parse_codec(codec: str) -> Tuple[str, Optional[str]]:
+	fmt, _, compression = codec.partition("+")
+	if fmt not in FORMATS or (compression and compression not in COMPRESSIONS):
+		raise ValueError(f"Unknown snapshot codec: {codec}")
+	return fmt, compression or None
+
+def stream_format(head: bytes) -> Optional[str]:
+	if head.startswith(RECORDS_MAGIC):
+		return "records"
+	if head.startswith(NDJSON_HEADER):
+		return "ndjson"
+	return None
+
+def _grouped_records(data: dict) -> Iterator[Tuple[str, Any]]:
+	# Every user's pokemon and bag entries follow its user record, so a streaming reader
+	# knows a user is complete as soon as the next user record starts.
+	owned: Dict[str, List[Tuple[str, Any]]] = {}
+	for key, kind in _LIST_KINDS.items():
+		for entry in data.get(key, ()):
+			owned.setdefault(entry["owner_id"], []).append((kind, entry))
+	
+	for user_id, user in data.get("users", {}).items():
+		yield USER, [user_id, user]
+		yield from owned.pop(user_id, ())
+	
+	for entries in owned.values():
+		yield from entries
+	
+	for key, value in data.items():
+		if key != "users" and key not in _LIST_KINDS:
+			yield OTHER, [key, value]
+
+def _write_records(data: dict, out: BinaryIO) -> None:
+	out.write(RECORDS_MAGIC)
+	for kind, value in _grouped_records(data):
+		payload = orjson.dumps(value)
+		out.write(RECORD_HEADER.pack(kind.encode(), len(payload)))
+		out.write(payload)
+
+def _write_ndjson(data: dict, out: BinaryIO) -> None:
+	out.write(NDJSON_HEADER)
+	for kind, value in _grouped_records(data):
+		out.write(orjson.dumps([kind, value], option=orjson.OPT_APPEND_NEWLINE))
+
+def _iter_binary(stream: BinaryIO) -> Iterator[Tuple[str, Any]]:
+	read = stream.read
+	size = RECORD_HEADER.size
+	while True:
+		header = read(size)
+		if not header:
+			return
+		if len(header) < size:
+			raise ValueError("Truncated records snapshot")
+		
+		kind, length = RECORD_HEADER.unpack(header)
+		payload = read(length)
+		if len(payload) < length:
+			raise ValueError("Truncated records snapshot")
+		yield kind.decode(), orjson.loads(payload)
+
+def _iter_ndjson(stream: BinaryIO) -> Iterator[Tuple[str, Any]]:
+	for line in stream:
+		if not line.endswith(b"\n"):
+			raise ValueError("Truncated ndjson snapshot")
+		kind, value = orjson.loads(line)
+		yield kind, value
+
+def iter_records(stream: BinaryIO) -> Iterator[Tuple[str, Any]]:
+	head = stream.read(len(RECORDS_MAGIC))
+	if head in (RECORDS_MAGIC, UNGROUPED_RECORDS_MAGIC):
+		return _iter_binary(stream)
+	if head + stream.readline() == NDJSON_HEADER:
+		return _iter_ndjson(stream)
+	raise ValueError("Not a record stream snapshot")
+
+def _read_records(stream: BinaryIO) -> dict:
+	data = {"users": {}, "pokemon": [], "bags": []}
+	users, pokemon, bags = data["users"], data["pokemon"], data["bags"]
+	
+	for kind, value in iter_records(stream):
+		if kind == POKEMON:
+			pokemon.append(value)
+		elif kind == BAG:
+			bags.append(value)
+		elif kind == USER:
+			users[value[0]] = value[1]
+		else:
+			data[value[0]] = value[1]
+	
+	return data
+
+class _ZlibReader(io.RawIOBase):
+	def __init__(self, raw: BinaryIO):
+		self._raw = raw
+		self._inflate = zlib.decompressobj()
+	
+	def readable(self) -> bool:
+		return True
+	
+	def readinto(self, buffer) -> int:
+		inflate = self._inflate
+		while not inflate.eof:
+			data = inflate.unconsumed_tail or self._raw.read(STREAM_CHUNK)
+			if not data:
+				raise ValueError("Truncated zlib snapshot")
+			
+			out = inflate.decompress(data, len(buffer))
+			if out:
+				buffer[:len(out)] = out
+				return len(out)
+		return 0
+	
+	def close(self) -> None:
+		if not self.closed:
+			self._raw.close()
+		super().close()
+
+def open_snapshot(path: Path) -> BinaryIO:
+	raw = open(path, "rb", buffering=STREAM_CHUNK)
+	head = raw.peek(2)[:2]
+	
+	if head == GZIP_MAGIC:
+		raw.close()
+		return io.BufferedReader(gzip.open(path, "rb"), STREAM_CHUNK)
+	if head in ZLIB_HEADERS:
+		return io.BufferedReader(_ZlibReader(raw), STREAM_CHUNK)
+	return raw
+
+def encode(data: dict, codec: str = DEFAULT_CODEC) -> bytes:
+	fmt, compression = parse_codec(codec)
+	
+	if fmt in STREAM_FORMATS:
+		buffer = io.BytesIO()
+		(_write_records if fmt == "records" else _write_ndjson)(data, buffer)
+		payload = buffer.getvalue()
+	elif fmt == "json-indent":
+		payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+	else:
+		payload = orjson.dumps(data)
+	
+	if compression == "zlib":
+		return zlib.compress(payload, 6)
+	if compression == "gzip":
+		return gzip.compress(payload, 6, mtime=0)
+	return payload
+
+def decode(payload: bytes) -> dict:
+	if payload[:2] == GZIP_MAGIC:
+		payload = gzip.decompress(payload)
+	elif payload[:2] in ZLIB_HEADERS:
+		payload = zlib.decompress(payload)
+	
+	with gc_paused():
+		if payload.startswith(UNGROUPED_RECORDS_MAGIC) or stream_format(payload[:len(NDJSON_HEADER)]) is not None:
+			return _read_records(io.BytesIO(payload))
+		return orjson.loads(payload)
+
+CODECS: Final[Tuple[str, ...]] = tuple(
+	f"{fmt}+{compression}" if compression else fmt
+	for fmt in FORMATS
+	for compression in (None, *COMPRESSIONS)
+)
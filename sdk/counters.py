@@ -0,0 +1,98 @@
+from typing import Dict, Final, FrozenSet, Iterable, List, Tuple
+from sdk.calculations import iv_percent
+
+COUNTER_KEYS: Final[Tuple[str, ...]] = (
+	"total", "party", "box", "favorites", "shinies", "legendaries", "mythicals",
+	"event", "rare", "iv_80_90", "iv_90_100", "iv_100"
+)
+COUNTED_FIELDS: Final[FrozenSet[str]] = frozenset({
+	"on_party", "is_favorite", "is_shiny", "is_legendary", "is_mythical", "is_event", "event", "ivs"
+})
+
+def classify(pokemon: dict) -> Tuple[str, ...]:
+	keys = ["total", "party" if pokemon.get("on_party", False) else "box"]
+	
+	if pokemon.get("is_favorite", False):
+		keys.append("favorites")
+	if pokemon.get("is_shiny", False):
+		keys.append("shinies")
+	if pokemon.get("is_legendary", False):
+		keys.append("legendaries")
+	if pokemon.get("is_mythical", False):
+		keys.append("mythicals")
+	if pokemon.get("is_legendary") or pokemon.get("is_mythical"):
+		keys.append("rare")
+	if pokemon.get("is_event") or pokemon.get("event"):
+		keys.append("event")
+	
+	ivs = pokemon.get("ivs")
+	if ivs:
+		ivp = iv_percent(ivs)
+		if ivp == 100:
+			keys.append("iv_100")
+		elif ivp >= 90:
+			keys.append("iv_90_100")
+		elif ivp >= 80:
+			keys.append("iv_80_90")
+	
+	return tuple(keys)
+
+def empty_counts() -> Dict[str, int]:
+	return dict.fromkeys(COUNTER_KEYS, 0)
+
+class CollectionCounters:
+	__slots__ = ("_owners",)
+	
+	def __init__(self):
+		self._owners: Dict[str, Dict[str, int]] = {}
+	
+	@classmethod
+	def recount(cls, pokemon: Iterable[dict]) -> "CollectionCounters":
+		counters = cls()
+		for p in pokemon:
+			counters.add(p)
+		return counters
+	
+	def add(self, pokemon: dict) -> None:
+		self._apply(pokemon["owner_id"], (), classify(pokemon))
+	
+	def remove(self, pokemon: dict) -> None:
+		self._apply(pokemon["owner_id"], classify(pokemon), ())
+	
+	def replace(self, owner_id: str, before: Tuple[str, ...], after: Tuple[str, ...]) -> None:
+		if before != after:
+			self._apply(owner_id, before, after)
+	
+	def _apply(self, owner_id: str, removed: Tuple[str, ...], added: Tuple[str, ...]) -> None:
+		# Each owner's counts are only touched under that owner's stripe, so plain increments are safe.
+		counts = self._owners.get(owner_id)
+		if counts is None:
+			counts = self._owners.setdefault(owner_id, empty_counts())
+		
+		for key in removed:
+			counts[key] -= 1
+		for key in added:
+			counts[key] += 1
+		
+		if not counts["total"]:
+			self._owners.pop(owner_id, None)
+	
+	def get(self, owner_id: str) -> Dict[str, int]:
+		counts = self._owners.get(owner_id)
+		return dict(counts) if counts else empty_counts()
+	
+	def count(self, owner_id: str, key: str) -> int:
+		counts = self._owners.get(owner_id)
+		return counts[key] if counts else 0
+	
+	def set(self, owner_id: str, counts: Dict[str, int]) -> None:
+		if counts["total"]:
+			self._owners[owner_id] = dict(counts)
+		else:
+			self._owners.pop(owner_id, None)
+	
+	def clear(self) -> None:
+		self._owners.clear()
+	
+	def diff(self, expected: "CollectionCounters", owners: Iterable[str]) -> List[str]:
+		return sorted(owner for owner in owners if self.get(owner) != expected.get(owner))
@@ -1,10 +1,60 @@
+import os
+import time
+import shutil
 import orjson
+import inspect
+import logging
 import threading
+from functools import wraps
+from contextlib import contextmanager, ExitStack
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Dict, Final, Iterable, Iterator, List, Optional, Set, Tuple
+from helpers.metrics import metrics, SIZE_BUCKETS
+from sdk.shards import ShardStore, empty_shard, split_by_bucket
+from sdk.codecs import DEFAULT_CODEC, NDJSON_HEADER, USER, POKEMON, BAG, parse_codec, encode, decode, gc_paused, open_snapshot, stream_format, iter_records
+
+LOCK_STRIPES: Final[int] = 64
+SHARD_COUNT_BUCKETS: Final[Tuple[float, ...]] = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+STREAM_CHUNK_USERS: Final[int] = 2048
+
+logger = logging.getLogger(__name__)
+
+def _user_args(func: Callable, names: Tuple[str, ...]) -> Callable[[tuple, dict], List[str]]:
+	params = list(inspect.signature(func).parameters)[1:]
+	positions = [(name, params.index(name)) for name in names or params[:1]]
+	
+	def extract(args: tuple, kwargs: dict) -> List[str]:
+		return [kwargs[name] if name in kwargs else args[index] for name, index in positions]
+	return extract
+
+def user_locked(*names: str) -> Callable:
+	def decorator(func: Callable) -> Callable:
+		user_ids = _user_args(func, names)
+		
+		@wraps(func)
+		def wrapper(self, *args, **kwargs):
+			with self.db.user_lock(*user_ids(args, kwargs)):
+				return func(self, *args, **kwargs)
+		return wrapper
+	return decorator
+
+def user_loaded(*names: str) -> Callable:
+	def decorator(func: Callable) -> Callable:
+		user_ids = _user_args(func, names)
+		
+		@wraps(func)
+		def wrapper(self, *args, **kwargs):
+			self.db.ensure_user(*user_ids(args, kwargs))
+			return func(self, *args, **kwargs)
+		return wrapper
+	return decorator
 
 class Database:
-	__slots__ = ("path", "_lock", "_data", "_initialized")
+	__slots__ = (
+		"path", "version", "codec", "structure_lock", "_lock", "_stripes", "_data", "_batch_depth", "_dirty",
+		"_shards", "_loaded", "_dirty_buckets", "_load_hooks", "_unload_hooks", "_touched", "_sizes", "_scope",
+		"_streamed", "_stream_progress", "_stream_error", "_initialized"
+	)
 	_instance = None
 	_instance_lock = threading.Lock()
 	
@@ -23,16 +73,60 @@ class Database:
 		
 		self.path = Path(path)
 		self._lock = threading.RLock()
+		self._stripes = tuple(threading.RLock() for _ in range(LOCK_STRIPES))
+		self.structure_lock = threading.RLock()
 		self._data: dict = {}
+		self._batch_depth = 0
+		self._dirty = False
+		self.version = 0
+		self.codec = DEFAULT_CODEC
+		self._shards: Optional[ShardStore] = ShardStore(self.path) if self.path.is_dir() or not self.path.suffix else None
+		self._loaded: Set[int] = set()
+		self._dirty_buckets: Set[int] = set()
+		self._load_hooks: List[Callable[[dict], None]] = []
+		self._unload_hooks: List[Callable[[dict], None]] = []
+		self._touched: Dict[int, float] = {}
+		self._sizes: Dict[int, int] = {}
+		self._scope = threading.local()
+		self._streamed = threading.Event()
+		self._streamed.set()
+		self._stream_progress = threading.Condition()
+		self._stream_error: Optional[BaseException] = None
 		self._load()
 		object.__setattr__(self, '_initialized', True)
 	
+	def set_codec(self, codec: str) -> None:
+		parse_codec(codec)
+		self.codec = codec
+		if self._shards is not None:
+			self._shards.codec = codec
+	
+	@property
+	def sharded(self) -> bool:
+		return self._shards is not None
+	
+	@property
+	def ready(self) -> bool:
+		return self._streamed.is_set()
+	
+	def wait_ready(self, timeout: Optional[float] = None) -> bool:
+		return self._streamed.wait(timeout)
+	
 	def _load(self) -> None:
 		with self._lock:
-			if not self.path.exists():
+			if self._shards is not None:
+				self._data = empty_shard()
+			elif not self.path.exists():
 				self._initialize()
 			else:
-				self._load_from_file()
+				stream = open_snapshot(self.path)
+				if stream_format(stream.peek(len(NDJSON_HEADER))) is None:
+					stream.close()
+					self._load_from_file()
+				else:
+					self._data = empty_shard()
+					self._streamed.clear()
+					threading.Thread(target=self._stream_from, args=(stream,), name="storage-loader", daemon=True).start()
 	
 	def _initialize(self) -> None:
 		self._data = {
@@ -44,37 +138,330 @@ class Database:
 	
 	def _load_from_file(self) -> None:
 		with open(self.path, "rb") as f:
-			self._data = orjson.loads(f.read())
+			self._data = decode(f.read())
 		
 		self._data.setdefault("users", {})
 		self._data.setdefault("pokemon", [])
 		self._data.setdefault("bags", [])
 	
+	def _stream_from(self, stream: BinaryIO) -> None:
+		# Record streams group each user's entries after its user record, so a chunk only ever
+		# holds complete users and everything committed so far can already be served.
+		started = time.perf_counter()
+		chunk, users = empty_shard(), 0
+		
+		try:
+			with stream, gc_paused():
+				for kind, value in iter_records(stream):
+					if kind == USER:
+						if users >= STREAM_CHUNK_USERS:
+							self._commit_chunk(chunk)
+							chunk, users = empty_shard(), 0
+						chunk["users"][value[0]] = value[1]
+						users += 1
+					elif kind == POKEMON:
+						chunk["pokemon"].append(value)
+					elif kind == BAG:
+						chunk["bags"].append(value)
+					else:
+						chunk[value[0]] = value[1]
+				self._commit_chunk(chunk)
+		except Exception as e:
+			self._stream_error = e
+			logger.exception("Falha ao carregar %s", self.path)
+		finally:
+			with self._stream_progress:
+				self._streamed.set()
+				self._stream_progress.notify_all()
+		
+		metrics.observe("db_stream_load_seconds", time.perf_counter() - started, help="Streaming database load duration")
+		
+		with self._lock:
+			if self._dirty and not self._batch_depth and self._stream_error is None:
+				self._dirty = False
+				self._flush()
+	
+	def _commit_chunk(self, chunk: dict) -> None:
+		with self.structure_lock:
+			self._data["users"].update(chunk["users"])
+			self._data["pokemon"].extend(chunk["pokemon"])
+			self._data["bags"].extend(chunk["bags"])
+			for key, value in chunk.items():
+				if key not in self._data:
+					self._data[key] = value
+			
+			for hook in self._load_hooks:
+				hook(chunk)
+		
+		with self._lock:
+			self.version += 1
+		with self._stream_progress:
+			self._stream_progress.notify_all()
+	
+	def _load_bucket(self, bucket: int) -> None:
+		shard, self._sizes[bucket] = self._shards.read(bucket)
+		
+		with self.structure_lock:
+			self._data["users"].update(shard["users"])
+			self._data["pokemon"].extend(shard["pokemon"])
+			self._data["bags"].extend(shard["bags"])
+			
+			for hook in self._load_hooks:
+				hook(shard)
+			# touch() skips ensure_user for loaded buckets, so only mark it once the indexes have it.
+			self._loaded.add(bucket)
+	
+	def touch(self, *user_ids: str) -> bool:
+		if self._shards is None:
+			if self._streamed.is_set():
+				return True
+			# A chunk's users land before its pokemon are indexed, so presence is only judged between chunks.
+			with self.structure_lock:
+				users = self._data["users"]
+				return all(user_id in users for user_id in user_ids)
+		
+		buckets = {self._shards.bucket_of(user_id) for user_id in user_ids}
+		now = time.monotonic()
+		for bucket in buckets:
+			self._touched[bucket] = now
+		return buckets <= self._loaded
+	
+	def ensure_user(self, *user_ids: str) -> None:
+		if self.touch(*user_ids):
+			return
+		
+		if self._shards is None:
+			# Users not streamed in yet may be further down the file or not exist at all.
+			with self._stream_progress:
+				while not self.touch(*user_ids):
+					self._stream_progress.wait()
+			return
+		
+		missing = {self._shards.bucket_of(user_id) for user_id in user_ids} - self._loaded
+		
+		with self._lock:
+			for bucket in sorted(missing - self._loaded):
+				self._load_bucket(bucket)
+				self.version += 1
+				metrics.inc("db_shard_loads_total", help="Storage shards loaded on first use")
+	
+	def is_loaded(self, user_id: str) -> bool:
+		if self._shards is None:
+			if self._streamed.is_set():
+				return True
+			with self.structure_lock:
+				return user_id in self._data["users"]
+		return self._shards.bucket_of(user_id) in self._loaded
+	
+	def add_load_hook(self, hook: Callable[[dict], None]) -> None:
+		self._load_hooks.append(hook)
+	
+	def add_unload_hook(self, hook: Callable[[dict], None]) -> None:
+		self._unload_hooks.append(hook)
+	
+	def resident_bytes(self) -> int:
+		return sum(self._sizes.get(bucket, 0) for bucket in self._loaded)
+	
+	def evict(self, ttl: float, budget: Optional[int] = None) -> int:
+		if self._shards is None:
+			return 0
+		
+		now = time.monotonic()
+		with self._lock:
+			by_age = sorted(self._loaded, key=lambda bucket: self._touched.get(bucket, 0.0))
+			victims = {bucket for bucket in by_age if now - self._touched.get(bucket, 0.0) > ttl}
+			
+			if budget is not None:
+				resident = self.resident_bytes() - sum(self._sizes.get(bucket, 0) for bucket in victims)
+				for bucket in by_age:
+					if resident <= budget:
+						break
+					if bucket not in victims:
+						victims.add(bucket)
+						resident -= self._sizes.get(bucket, 0)
+		
+		if victims:
+			self._evict_buckets(victims)
+		return len(victims)
+	
+	def _evict_buckets(self, buckets: Iterable[int]) -> None:
+		buckets = set(buckets)
+		bucket_of = self._shards.bucket_of
+		
+		# Every stripe is taken in order, so no mutation of an evicted user can be in flight.
+		with ExitStack() as stack:
+			for stripe in self._stripes:
+				stack.enter_context(stripe)
+			stack.enter_context(self._lock)
+			
+			if self._dirty_buckets & buckets:
+				self._flush()
+			
+			evicted = split_by_bucket(self._data, bucket_of, buckets & self._loaded)
+			with self.structure_lock:
+				users = self._data["users"]
+				for shard in evicted.values():
+					for user_id in shard["users"]:
+						del users[user_id]
+				for key in ("pokemon", "bags"):
+					self._data[key][:] = [entry for entry in self._data[key] if bucket_of(entry["owner_id"]) not in buckets]
+			
+			for bucket, shard in evicted.items():
+				self._loaded.discard(bucket)
+				self._touched.pop(bucket, None)
+				for hook in self._unload_hooks:
+					hook(shard)
+			self.version += 1
+		
+		metrics.inc("db_shard_evictions_total", len(evicted), help="Storage shards evicted from memory")
+	
+	def freeze(self, target: Path) -> int:
+		"""Hard-links the on-disk state into target and returns the version it reflects.
+		
+		Saves replace files rather than rewriting them, so the links keep this version while writes continue.
+		"""
+		self._streamed.wait()
+		target.mkdir(parents=True, exist_ok=True)
+		
+		with ExitStack() as stack:
+			for stripe in self._stripes:
+				stack.enter_context(stripe)
+			stack.enter_context(self._lock)
+			
+			if self._dirty or self._dirty_buckets:
+				self._dirty = False
+				self._flush()
+			
+			for source in ([self.path] if self._shards is None else self._shards.files()):
+				try:
+					os.link(source, target / source.name)
+				except OSError:
+					shutil.copy2(source, target / source.name)
+			return self.version
+	
+	def _scope_users(self) -> List[str]:
+		return [user_id for user_ids in getattr(self._scope, "users", ()) for user_id in user_ids]
+	
 	def save(self) -> None:
 		with self._lock:
+			self.version += 1
+			
+			if self._shards is not None:
+				# Saves inside a user_lock only dirty those users' shards; anything else rewrites every loaded shard.
+				users = self._scope_users()
+				self._dirty_buckets.update(map(self._shards.bucket_of, users) if users else self._loaded)
+			
+			# Writes made while a stream is still loading are flushed once it finishes.
+			if self._batch_depth or not self._streamed.is_set():
+				self._dirty = True
+				return
+			
+			self._flush()
+	
+	def _flush(self) -> None:
+		started = time.perf_counter()
+		
+		if self._stream_error is not None:
+			raise RuntimeError(f"Refusing to overwrite {self.path} after a failed load") from self._stream_error
+		
+		# Inserts and deletes only hold structure_lock, so encode a shallow copy taken under it.
+		with self.structure_lock:
+			data = {key: value.copy() if isinstance(value, (dict, list)) else value for key, value in self._data.items()}
+		
+		if self._shards is None:
+			payload = encode(data, self.codec)
 			tmp_path = self.path.with_suffix(".tmp")
-			tmp_path.write_bytes(orjson.dumps(self._data, option=orjson.OPT_INDENT_2))
+			tmp_path.write_bytes(payload)
 			tmp_path.replace(self.path)
+			size = len(payload)
+		else:
+			buckets, self._dirty_buckets = self._dirty_buckets & self._loaded, set()
+			shards = split_by_bucket(data, self._shards.bucket_of, buckets)
+			size = 0
+			for bucket, shard in shards.items():
+				self._sizes[bucket] = self._shards.write(bucket, shard)
+				size += self._sizes[bucket]
+			metrics.observe("db_save_shards", len(shards), help="Shards rewritten per Database.save", buckets=SHARD_COUNT_BUCKETS)
+		
+		metrics.observe("db_save_seconds", time.perf_counter() - started, help="Database.save duration")
+		metrics.observe("db_save_bytes", size, help="Database.save snapshot size", buckets=SIZE_BUCKETS)
+	
+	@contextmanager
+	def batch(self) -> Iterator[None]:
+		with self._lock:
+			self._batch_depth += 1
+		
+		try:
+			yield
+		finally:
+			with self._lock:
+				self._batch_depth -= 1
+				if not self._batch_depth and self._dirty and self._streamed.is_set():
+					self._dirty = False
+					self._flush()
 	
 	def _save(self) -> None:
 		self.save()
 	
 	def reload(self) -> None:
+		self._streamed.wait()
 		with self._lock:
-			self._load_from_file()
+			if self._shards is None:
+				self._load_from_file()
+			else:
+				loaded, self._loaded = sorted(self._loaded), set()
+				self._data = empty_shard()
+				for bucket in loaded:
+					self._load_bucket(bucket)
+			self.version += 1
+	
+	@contextmanager
+	def user_lock(self, *user_ids: str) -> Iterator[None]:
+		# Stripes are always taken in index order, so multi-user operations cannot deadlock.
+		stripes = sorted(set(map(self.stripe_of, user_ids)))
+		with ExitStack() as stack:
+			for stripe in stripes:
+				stack.enter_context(self._stripes[stripe])
+			self.ensure_user(*user_ids)
+			
+			scope = getattr(self._scope, "users", None)
+			if scope is None:
+				scope = self._scope.users = []
+			scope.append(user_ids)
+			try:
+				yield
+			finally:
+				scope.pop()
+	
+	@staticmethod
+	def stripe_of(user_id: str) -> int:
+		return hash(user_id) % LOCK_STRIPES
+	
+	@contextmanager
+	def stripe_locked(self, stripe: int) -> Iterator[None]:
+		with self._stripes[stripe]:
+			yield
 	
 	def get(self, key: str) -> Any:
-		with self._lock:
-			return self._data.get(key)
+		return self._data.get(key)
 	
 	def set(self, key: str, value: Any) -> None:
 		with self._lock:
-			self._data[key] = value
+			with self.structure_lock:
+				self._data[key] = value
 			self._save()
 	
 	def clear(self) -> None:
+		self._streamed.wait()
 		with self._lock:
-			self._initialize()
+			if self._shards is None:
+				self._initialize()
+			else:
+				self._shards.clear()
+				self._data = empty_shard()
+				self._loaded.clear()
+				self._dirty_buckets.clear()
+				self.version += 1
 	
 	@classmethod
 	def reset_instance(cls):
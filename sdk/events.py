@@ -0,0 +1,79 @@
+import logging
+import threading
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Final, FrozenSet, Optional, Tuple
+from helpers.metrics import metrics
+
+USER: Final[str] = "user"
+POKEMON: Final[str] = "pokemon"
+BAG: Final[str] = "bag"
+
+CREATE: Final[str] = "create"
+UPDATE: Final[str] = "update"
+DELETE: Final[str] = "delete"
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[["Change"], None]
+
+@dataclass(frozen=True)
+class Change:
+	entity: str
+	op: str
+	owner_id: str
+	entity_id: Any
+	before: Dict[str, Any] = field(default_factory=dict)
+	after: Dict[str, Any] = field(default_factory=dict)
+	
+	@property
+	def fields(self) -> FrozenSet[str]:
+		return frozenset(self.before) | frozenset(self.after)
+	
+	# Records are copied down to nested ivs, moves and status so subscribers never alias live state.
+	# An update's before values must already be copies, taken by the caller ahead of the mutation.
+	@classmethod
+	def created(cls, entity: str, owner_id: str, entity_id: Any, record: dict) -> "Change":
+		return cls(entity, CREATE, owner_id, entity_id, {}, deepcopy(record))
+	
+	@classmethod
+	def updated(cls, entity: str, owner_id: str, entity_id: Any, before: Dict[str, Any], record: dict) -> "Change":
+		return cls(entity, UPDATE, owner_id, entity_id, before, {key: deepcopy(record.get(key)) for key in before})
+	
+	@classmethod
+	def deleted(cls, entity: str, owner_id: str, entity_id: Any, record: dict) -> "Change":
+		return cls(entity, DELETE, owner_id, entity_id, deepcopy(record), {})
+
+class ChangeBus:
+	def __init__(self):
+		self._subscribers: Dict[Optional[str], Tuple[Subscriber, ...]] = {}
+		self._lock = threading.Lock()
+	
+	def subscribe(self, callback: Subscriber, entity: Optional[str] = None) -> Callable[[], None]:
+		# Subscriber tuples are replaced rather than mutated so emit never needs the lock.
+		with self._lock:
+			self._subscribers[entity] = (*self._subscribers.get(entity, ()), callback)
+		
+		def unsubscribe() -> None:
+			with self._lock:
+				remaining = tuple(cb for cb in self._subscribers.get(entity, ()) if cb is not callback)
+				if remaining:
+					self._subscribers[entity] = remaining
+				else:
+					self._subscribers.pop(entity, None)
+		return unsubscribe
+	
+	def listening(self, entity: str) -> bool:
+		# Building a Change deep-copies the record, so writers skip it when nobody would receive it.
+		return entity in self._subscribers or None in self._subscribers
+	
+	def emit(self, change: Change) -> None:
+		metrics.inc("storage_changes_total", labels={"entity": change.entity, "op": change.op}, help="Repository mutations published on the change bus")
+		
+		for callback in self._subscribers.get(change.entity, ()) + self._subscribers.get(None, ()):
+			try:
+				callback(change)
+			except Exception:
+				logger.exception("Falha no assinante de mudanças %r", callback)
+
+changes = ChangeBus()
@@ -0,0 +1,113 @@
+from typing import Callable, Dict, Final, Iterable, List, Optional, Tuple
+
+POKEDEX_SIZE: Final[int] = 386
+REGION_RANGES: Final[Dict[str, Tuple[int, int]]] = {
+	"Kanto": (1, 151),
+	"Johto": (152, 251),
+	"Hoenn": (252, 386)
+}
+
+def species_mask(first: int, last: int) -> int:
+	return ((1 << (last - first + 1)) - 1) << first
+
+DEX_MASK: Final[int] = species_mask(1, POKEDEX_SIZE)
+REGION_MASKS: Final[Dict[str, int]] = {region: species_mask(*bounds) for region, bounds in REGION_RANGES.items()}
+
+def encode_species(mask: int) -> str:
+	return format(mask, "x")
+
+def decode_species(value: Optional[str]) -> int:
+	return int(value, 16) if value else 0
+
+class Pokedex:
+	__slots__ = ("caught", "seen", "refs")
+	
+	def __init__(self, seen: int = 0):
+		self.caught = 0
+		self.seen = seen
+		self.refs: Dict[int, int] = {}
+	
+	def add(self, species_id: int) -> None:
+		count = self.refs.get(species_id, 0)
+		self.refs[species_id] = count + 1
+		if not count:
+			bit = 1 << species_id
+			self.caught |= bit
+			self.seen |= bit
+	
+	def remove(self, species_id: int) -> None:
+		count = self.refs.get(species_id, 0) - 1
+		if count > 0:
+			self.refs[species_id] = count
+		else:
+			self.refs.pop(species_id, None)
+			self.caught &= ~(1 << species_id)
+	
+	def has_caught(self, species_id: int) -> bool:
+		return bool(self.caught >> species_id & 1)
+	
+	def has_seen(self, species_id: int) -> bool:
+		return bool(self.seen >> species_id & 1)
+	
+	def summary(self) -> dict:
+		caught = (self.caught & DEX_MASK).bit_count()
+		return {
+			"caught": caught,
+			"seen": (self.seen & DEX_MASK).bit_count(),
+			"total": POKEDEX_SIZE,
+			"completion": round(caught / POKEDEX_SIZE * 100, 2),
+			"regions": {
+				region: {
+					"caught": (self.caught & REGION_MASKS[region]).bit_count(),
+					"seen": (self.seen & REGION_MASKS[region]).bit_count(),
+					"total": last - first + 1
+				}
+				for region, (first, last) in REGION_RANGES.items()
+			}
+		}
+
+class PokedexIndex:
+	__slots__ = ("_owners", "_seen_of")
+	
+	def __init__(self, seen_of: Callable[[str], int]):
+		self._owners: Dict[str, Pokedex] = {}
+		self._seen_of = seen_of
+	
+	@classmethod
+	def recount(cls, pokemon: Iterable[dict], seen_of: Callable[[str], int]) -> "PokedexIndex":
+		index = cls(seen_of)
+		for p in pokemon:
+			index.add(p)
+		return index
+	
+	def add(self, pokemon: dict) -> None:
+		owner_id = pokemon["owner_id"]
+		dex = self._owners.get(owner_id)
+		if dex is None:
+			dex = self._owners.setdefault(owner_id, Pokedex(self._seen_of(owner_id)))
+		dex.add(pokemon["species_id"])
+	
+	def remove(self, pokemon: dict) -> None:
+		dex = self._owners.get(pokemon["owner_id"])
+		if dex is None:
+			return
+		
+		dex.remove(pokemon["species_id"])
+		if not dex.refs:
+			self._owners.pop(pokemon["owner_id"], None)
+	
+	def get(self, owner_id: str) -> Pokedex:
+		dex = self._owners.get(owner_id)
+		return dex if dex is not None else Pokedex(self._seen_of(owner_id))
+	
+	def set(self, owner_id: str, dex: Pokedex) -> None:
+		if dex.refs:
+			self._owners[owner_id] = dex
+		else:
+			self._owners.pop(owner_id, None)
+	
+	def clear(self) -> None:
+		self._owners.clear()
+	
+	def diff(self, expected: "PokedexIndex", owners: Iterable[str]) -> List[str]:
+		return sorted(owner for owner in owners if self.get(owner).refs != expected.get(owner).refs)
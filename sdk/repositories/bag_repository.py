@@ -1,5 +1,6 @@
-from typing import Final
-from sdk.database import Database
+from typing import Callable, Final
+from sdk.database import Database, user_locked, user_loaded
+from sdk.events import changes, Change, BAG
 
 MAX_ITEM_QUANTITY: Final[int] = 999
 
@@ -7,10 +8,39 @@ class BagRepository:
 	def __init__(self, db: Database):
 		self.db = db
 	
+	def _set_quantity(self, item: dict, quantity: int) -> int:
+		before = {"quantity": item["quantity"]}
+		item["quantity"] = quantity
+		self.db.save()
+		if changes.listening(BAG):
+			changes.emit(Change.updated(BAG, item["owner_id"], item["id"], before, item))
+		return quantity
+	
+	def _append(self, item: dict) -> int:
+		with self.db.structure_lock:
+			self.db.get("bags").append(item)
+		self.db.save()
+		if changes.listening(BAG):
+			changes.emit(Change.created(BAG, item["owner_id"], item["id"], item))
+		return item["quantity"]
+	
+	def _remove_where(self, user_id: str, predicate: Callable[[dict], bool]) -> None:
+		bags = self.db.get("bags")
+		with self.db.structure_lock:
+			removed = [item for item in bags if item["owner_id"] == user_id and predicate(item)]
+			removed_ids = set(map(id, removed))
+			bags[:] = [item for item in bags if id(item) not in removed_ids]
+		self.db.save()
+		if changes.listening(BAG):
+			for item in removed:
+				changes.emit(Change.deleted(BAG, user_id, item["id"], item))
+	
+	@user_loaded()
 	def get_all(self, user_id: str) -> list[dict]:
 		bags = self.db.get("bags")
 		return [item.copy() for item in bags if item["owner_id"] == user_id]
 	
+	@user_loaded()
 	def get_quantity(self, user_id: str, item_id: str) -> int:
 		bags = self.db.get("bags")
 		
@@ -20,9 +50,11 @@ class BagRepository:
 		
 		return 0
 	
+	@user_loaded()
 	def has_item(self, user_id: str, item_id: str, quantity: int = 1) -> bool:
 		return self.get_quantity(user_id, item_id) >= quantity
 	
+	@user_locked()
 	def add(self, user_id: str, item_id: str, item_name: str, quantity: int = 1, category: str = "items") -> int:
 		if quantity <= 0:
 			raise ValueError(f"Quantity must be positive: {quantity}")
@@ -40,49 +72,42 @@ class BagRepository:
 						f"Current: {item['quantity']}, Max: {MAX_ITEM_QUANTITY}, Can add: {added}"
 					)
 				
-				item["quantity"] = new_quantity
-				self.db.save()
-				return item["quantity"]
+				return self._set_quantity(item, new_quantity)
 		
 		if quantity > MAX_ITEM_QUANTITY:
 			raise ValueError(f"Quantity exceeds maximum: {quantity} > {MAX_ITEM_QUANTITY}")
 		
-		bags.append({
+		return self._append({
 			"owner_id": user_id,
 			"id": item_id,
 			"name": item_name,
 			"category": category,
 			"quantity": quantity
 		})
-		
-		self.db.save()
-		return quantity
 	
+	@user_locked()
 	def remove(self, user_id: str, item_id: str, quantity: int = 1) -> int:
 		if quantity <= 0:
 			raise ValueError(f"Quantity must be positive: {quantity}")
 		
 		bags = self.db.get("bags")
 		
-		for i, item in enumerate(bags):
+		for item in bags:
 			if item["owner_id"] == user_id and item["id"] == item_id:
 				if item["quantity"] < quantity:
 					raise ValueError(
 						f"Not enough items: has {item['quantity']}, needs {quantity}"
 					)
 				
-				item["quantity"] -= quantity
-				
-				if item["quantity"] <= 0:
-					del bags[i]
-					self.db.save()
+				if item["quantity"] <= quantity:
+					self._remove_where(user_id, lambda entry: entry is item)
 					return 0
 				
-				self.db.save()
-				return item["quantity"]
+				return self._set_quantity(item, item["quantity"] - quantity)
 		
 		raise ValueError(f"Item not found: {item_id}")
 	
+	@user_locked()
 	def set_quantity(self, user_id: str, item_id: str, quantity: int, category: str = "items") -> int:
 		if quantity < 0:
 			raise ValueError(f"Quantity cannot be negative: {quantity}")
@@ -93,42 +118,29 @@ class BagRepository:
 		bags = self.db.get("bags")
 		
 		if quantity == 0:
-			bags[:] = [
-				item for item in bags 
-				if not (item["owner_id"] == user_id and item["id"] == item_id)
-			]
-			self.db.save()
+			self._remove_where(user_id, lambda item: item["id"] == item_id)
 			return 0
 		
 		for item in bags:
 			if item["owner_id"] == user_id and item["id"] == item_id:
-				item["quantity"] = quantity
-				self.db.save()
-				return quantity
+				return self._set_quantity(item, quantity)
 		
-		bags.append({
+		return self._append({
 			"owner_id": user_id,
 			"id": item_id,
 			"category": category,
 			"quantity": quantity
 		})
-		
-		self.db.save()
-		return quantity
 	
+	@user_locked()
 	def clear(self, user_id: str) -> None:
-		bags = self.db.get("bags")
-		bags[:] = [item for item in bags if item["owner_id"] != user_id]
-		self.db.save()
+		self._remove_where(user_id, lambda item: True)
 	
+	@user_locked()
 	def clear_category(self, user_id: str, category: str) -> None:
-		bags = self.db.get("bags")
-		bags[:] = [
-			item for item in bags 
-			if not (item["owner_id"] == user_id and item.get("category") == category)
-		]
-		self.db.save()
+		self._remove_where(user_id, lambda item: item.get("category") == category)
 	
+	@user_loaded()
 	def get_by_category(self, user_id: str, category: str) -> list[dict]:
 		bags = self.db.get("bags")
 		return [
@@ -136,6 +148,7 @@ class BagRepository:
 			if item["owner_id"] == user_id and item.get("category") == category
 		]
 	
+	@user_loaded()
 	def count_total_items(self, user_id: str) -> int:
 		bags = self.db.get("bags")
 		return sum(
@@ -143,6 +156,7 @@ class BagRepository:
 			if item["owner_id"] == user_id
 		)
 	
+	@user_loaded()
 	def count_unique_items(self, user_id: str) -> int:
 		bags = self.db.get("bags")
 		return sum(
@@ -150,14 +164,17 @@ class BagRepository:
 			if item["owner_id"] == user_id
 		)
 	
+	@user_loaded()
 	def is_empty(self, user_id: str) -> bool:
 		return self.count_unique_items(user_id) == 0
 	
+	@user_locked("from_user_id", "to_user_id")
 	def transfer(self, from_user_id: str, to_user_id: str, item_id: str, quantity: int = 1) -> tuple[int, int]:
 		from_qty = self.remove(from_user_id, item_id, quantity)
 		to_qty = self.add(to_user_id, item_id, quantity)
 		return (from_qty, to_qty)
 	
+	@user_loaded()
 	def get_item_info(self, user_id: str, item_id: str) -> dict | None:
 		bags = self.db.get("bags")
 		
@@ -167,6 +184,7 @@ class BagRepository:
 		
 		return None
 	
+	@user_loaded()
 	def can_add(self, user_id: str, item_id: str, quantity: int) -> bool:
 		current_qty = self.get_quantity(user_id, item_id)
 
@@ -1,23 +1,60 @@
+from copy import deepcopy
 from typing import Optional
 from datetime import datetime
-from sdk.database import Database
+from sdk.database import Database, user_locked, user_loaded
+from sdk.events import changes, Change, POKEMON
+from sdk.counters import CollectionCounters, COUNTED_FIELDS, classify
+from sdk.pokedex import PokedexIndex, encode_species, decode_species
 from sdk.constants import PARTY_LIMIT, MOVES_LIMIT, STAT_KEYS
 
 class PokemonRepository:
     def __init__(self, db: Database):
         self.db = db
-        self._index: dict[tuple[str, int], int] = {}
-        self._rebuild_index()
+        self._index: dict[tuple[str, int], dict] = {}
+        self._counters = CollectionCounters()
+        self._pokedex = PokedexIndex(self._stored_seen)
+        
+        # Chunks streamed in while the index is built must not slip between the two steps.
+        with self.db.structure_lock:
+            self._rebuild_index()
+            self.db.add_load_hook(self._index_shard)
+        self.db.add_unload_hook(self._unindex_shard)
     
     def _rebuild_index(self) -> None:
         self._index.clear()
-        pokemon_list = self.db.get("pokemon")
-        
-        for i, p in enumerate(pokemon_list):
-            key = (p["owner_id"], p["id"])
-            self._index[key] = i
-    
-    def _get_index(self, owner_id: str, pokemon_id: int) -> int:
+        self._counters.clear()
+        self._pokedex.clear()
+        self._index_shard({"pokemon": self.db.get("pokemon")})
+    
+    def _index_shard(self, shard: dict) -> None:
+        for p in shard["pokemon"]:
+            previous = self._index.get((p["owner_id"], p["id"]))
+            if previous is not None:
+                self._counters.remove(previous)
+                self._pokedex.remove(previous)
+            self._index[(p["owner_id"], p["id"])] = p
+            self._counters.add(p)
+            self._pokedex.add(p)
+    
+    def _unindex_shard(self, shard: dict) -> None:
+        for p in shard["pokemon"]:
+            if self._index.pop((p["owner_id"], p["id"]), None) is not None:
+                self._counters.remove(p)
+                self._pokedex.remove(p)
+    
+    def _stored_seen(self, owner_id: str) -> int:
+        user = self.db.get("users").get(owner_id)
+        return decode_species(user.get("pokedex_seen")) if user else 0
+    
+    def _persist_seen(self, owner_id: str) -> None:
+        # Caught bits are rebuilt from the pokemon list on load. Seen bits are every species the user has owned,
+        # which outlive releases and trades, so they only survive in the user record.
+        user = self.db.get("users").get(owner_id)
+        seen = self._pokedex.get(owner_id).seen
+        if user is not None and decode_species(user.get("pokedex_seen")) != seen:
+            user["pokedex_seen"] = encode_species(seen)
+    
+    def _get_pokemon(self, owner_id: str, pokemon_id: int) -> dict:
         key = (owner_id, pokemon_id)
         
         if key not in self._index:
@@ -25,6 +62,7 @@ class PokemonRepository:
         
         return self._index[key]
     
+    @user_locked()
     def create(self, owner_id: str, data: dict) -> dict:
         pokemon_list = self.db.get("pokemon")
         users = self.db.get("users")
@@ -48,55 +86,85 @@ class PokemonRepository:
             **data
         }
         
-        pokemon_list.append(pokemon)
-        self._index[(owner_id, pokemon_id)] = len(pokemon_list) - 1
+        with self.db.structure_lock:
+            pokemon_list.append(pokemon)
+            self._index[(owner_id, pokemon_id)] = pokemon
+            self._counters.add(pokemon)
+            self._pokedex.add(pokemon)
+        self._persist_seen(owner_id)
         self.db.save()
+        if changes.listening(POKEMON):
+            changes.emit(Change.created(POKEMON, owner_id, pokemon_id, pokemon))
         
         return pokemon.copy()
     
+    @user_loaded()
     def get(self, owner_id: str, pokemon_id: int) -> dict:
-        idx = self._get_index(owner_id, pokemon_id)
-        pokemon_list = self.db.get("pokemon")
-        return pokemon_list[idx].copy()
+        return self._get_pokemon(owner_id, pokemon_id).copy()
     
+    @user_locked()
     def update(self, owner_id: str, pokemon_id: int, updates: dict) -> dict:
-        idx = self._get_index(owner_id, pokemon_id)
-        pokemon_list = self.db.get("pokemon")
-        
-        pokemon_list[idx].update(updates)
+        pokemon = self._get_pokemon(owner_id, pokemon_id)
+        before = {key: deepcopy(pokemon.get(key)) for key in updates} if changes.listening(POKEMON) else None
+        counted = classify(pokemon) if COUNTED_FIELDS.intersection(updates) else None
+        evolved = "species_id" in updates and updates["species_id"] != pokemon["species_id"]
+        if evolved:
+            self._pokedex.remove(pokemon)
+        
+        pokemon.update(updates)
+        if counted is not None:
+            self._counters.replace(owner_id, counted, classify(pokemon))
+        if evolved:
+            self._pokedex.add(pokemon)
+            self._persist_seen(owner_id)
         self.db.save()
+        if before is not None:
+            changes.emit(Change.updated(POKEMON, owner_id, pokemon_id, before, pokemon))
         
-        return pokemon_list[idx].copy()
+        return pokemon.copy()
     
+    @user_locked()
     def delete(self, owner_id: str, pokemon_id: int) -> None:
-        idx = self._get_index(owner_id, pokemon_id)
+        pokemon = self._get_pokemon(owner_id, pokemon_id)
         pokemon_list = self.db.get("pokemon")
         
-        del pokemon_list[idx]
-        self._rebuild_index()
+        with self.db.structure_lock:
+            idx = next(i for i, p in enumerate(pokemon_list) if p is pokemon)
+            del pokemon_list[idx]
+            del self._index[(owner_id, pokemon_id)]
+            self._counters.remove(pokemon)
+            self._persist_seen(owner_id)
+            self._pokedex.remove(pokemon)
         self.db.save()
+        if changes.listening(POKEMON):
+            changes.emit(Change.deleted(POKEMON, owner_id, pokemon_id, pokemon))
     
+    @user_loaded()
     def get_all_by_owner(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id]
     
+    @user_loaded()
     def get_party(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         party = [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and p.get("on_party", False)]
         party.sort(key=lambda p: p.get("party_pos", 999))
         return party
     
+    @user_loaded()
     def get_box(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and not p.get("on_party", False)]
     
+    @user_loaded()
     def count_party(self, owner_id: str) -> int:
-        pokemon_list = self.db.get("pokemon")
-        return sum(1 for p in pokemon_list if p["owner_id"] == owner_id and p.get("on_party", False))
+        return self._counters.count(owner_id, "party")
     
+    @user_loaded()
     def can_add_to_party(self, owner_id: str) -> bool:
         return self.count_party(owner_id) < PARTY_LIMIT
     
+    @user_locked()
     def move_to_party(self, owner_id: str, pokemon_id: int) -> dict:
         if not self.can_add_to_party(owner_id):
             raise ValueError(f"Party is full ({PARTY_LIMIT}/{PARTY_LIMIT})")
@@ -106,6 +174,7 @@ class PokemonRepository:
     def move_to_box(self, owner_id: str, pokemon_id: int) -> dict:
         return self.update(owner_id, pokemon_id, {"on_party": False})
     
+    @user_locked()
     def reorder_party(self, owner_id: str, order: list[int]) -> list[dict]:
         party = self.get_party(owner_id)
         current_ids = [p["id"] for p in party]
@@ -121,6 +190,7 @@ class PokemonRepository:
         
         return [self.get(owner_id, pid) for pid in order]
     
+    @user_locked()
     def swap_party_positions(self, owner_id: str, pos_a: int, pos_b: int) -> list[dict]:
         party = self.get_party(owner_id)
         
@@ -141,6 +211,7 @@ class PokemonRepository:
     def set_favorite(self, owner_id: str, pokemon_id: int, is_favorite: bool) -> dict:
         return self.update(owner_id, pokemon_id, {"is_favorite": is_favorite})
     
+    @user_locked()
     def toggle_favorite(self, owner_id: str, pokemon_id: int) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
         return self.set_favorite(owner_id, pokemon_id, not pokemon.get("is_favorite", False))
@@ -175,6 +246,7 @@ class PokemonRepository:
     def set_happiness(self, owner_id: str, pokemon_id: int, happiness: int) -> dict:
         return self.update(owner_id, pokemon_id, {"happiness": max(0, min(happiness, 255))})
     
+    @user_locked()
     def add_happiness(self, owner_id: str, pokemon_id: int, amount: int) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
         new_happiness = max(0, min(pokemon.get("happiness", 70) + amount, 255))
@@ -186,6 +258,7 @@ class PokemonRepository:
     def set_evs(self, owner_id: str, pokemon_id: int, evs: dict[str, int]) -> dict:
         return self.update(owner_id, pokemon_id, {"evs": evs})
     
+    @user_locked()
     def add_evs(self, owner_id: str, pokemon_id: int, ev_gains: dict[str, int]) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
         current_evs = pokemon.get("evs", {k: 0 for k in STAT_KEYS})
@@ -197,6 +270,7 @@ class PokemonRepository:
             raise ValueError(f"Too many moves: {len(moves)}/{MOVES_LIMIT}")
         return self.update(owner_id, pokemon_id, {"moves": moves})
     
+    @user_locked()
     def add_move(self, owner_id: str, pokemon_id: int, move_id: str, pp: int, pp_max: int) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
         moves = pokemon.get("moves", [])
@@ -207,55 +281,53 @@ class PokemonRepository:
         if any(m["id"] == move_id for m in moves):
             return pokemon
         
-        moves.append({"id": move_id, "pp": pp, "pp_max": pp_max})
-        return self.set_moves(owner_id, pokemon_id, moves)
+        return self.set_moves(owner_id, pokemon_id, [*moves, {"id": move_id, "pp": pp, "pp_max": pp_max}])
     
+    @user_locked()
     def remove_move(self, owner_id: str, pokemon_id: int, move_id: str) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
         moves = [m for m in pokemon.get("moves", []) if m["id"] != move_id]
         return self.set_moves(owner_id, pokemon_id, moves)
     
+    @user_locked()
     def replace_move(self, owner_id: str, pokemon_id: int, old_move_id: str, new_move_id: str, pp: int, pp_max: int) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
-        moves = pokemon.get("moves", [])
-        
-        for i, move in enumerate(moves):
-            if move["id"] == old_move_id:
-                moves[i] = {"id": new_move_id, "pp": pp, "pp_max": pp_max}
-                break
-        
+        moves = [
+            {"id": new_move_id, "pp": pp, "pp_max": pp_max} if move["id"] == old_move_id else move
+            for move in pokemon.get("moves", [])
+        ]
         return self.set_moves(owner_id, pokemon_id, moves)
     
+    @user_loaded()
     def has_move(self, owner_id: str, pokemon_id: int, move_id: str) -> bool:
         pokemon = self.get(owner_id, pokemon_id)
         return any(m["id"] == move_id for m in pokemon.get("moves", []))
     
+    @user_locked()
     def set_move_pp(self, owner_id: str, pokemon_id: int, move_id: str, pp: int) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
-        moves = pokemon.get("moves", [])
-        
-        for move in moves:
-            if move["id"] == move_id:
-                move["pp"] = max(0, min(pp, move["pp_max"]))
-                break
-        
+        moves = [
+            {**move, "pp": max(0, min(pp, move["pp_max"]))} if move["id"] == move_id else move
+            for move in pokemon.get("moves", [])
+        ]
         return self.set_moves(owner_id, pokemon_id, moves)
     
+    @user_locked()
     def restore_pp(self, owner_id: str, pokemon_id: int, move_id: Optional[str] = None) -> dict:
         pokemon = self.get(owner_id, pokemon_id)
-        moves = pokemon.get("moves", [])
-        
-        for move in moves:
-            if move_id is None or move["id"] == move_id:
-                move["pp"] = move["pp_max"]
-        
+        moves = [
+            {**move, "pp": move["pp_max"]} if move_id is None or move["id"] == move_id else move
+            for move in pokemon.get("moves", [])
+        ]
         return self.set_moves(owner_id, pokemon_id, moves)
     
+    @user_locked()
     def heal(self, owner_id: str, pokemon_id: int, max_hp: int) -> dict:
         self.restore_pp(owner_id, pokemon_id)
         self.clear_status(owner_id, pokemon_id)
         return self.set_hp(owner_id, pokemon_id, max_hp)
     
+    @user_locked()
     def heal_party(self, owner_id: str) -> list[dict]:
         from sdk.calculations import StatCalculator
         
@@ -276,18 +348,21 @@ class PokemonRepository:
     def block_evolution(self, owner_id: str, pokemon_id: int, blocked: bool = True) -> dict:
         return self.update(owner_id, pokemon_id, {"evolution_blocked": blocked})
     
+    @user_loaded()
     def is_evolution_blocked(self, owner_id: str, pokemon_id: int) -> bool:
         pokemon = self.get(owner_id, pokemon_id)
         return pokemon.get("evolution_blocked", False)
     
+    @user_locked("owner_id", "new_owner_id")
     def transfer(self, owner_id: str, pokemon_id: int, new_owner_id: str) -> dict:
-        idx = self._get_index(owner_id, pokemon_id)
-        pokemon_list = self.db.get("pokemon")
+        pokemon = self._get_pokemon(owner_id, pokemon_id)
         users = self.db.get("users")
-        
-        pokemon = pokemon_list[idx]
+        removed = Change.deleted(POKEMON, owner_id, pokemon_id, pokemon) if changes.listening(POKEMON) else None
         
         del self._index[(owner_id, pokemon_id)]
+        self._counters.remove(pokemon)
+        self._persist_seen(owner_id)
+        self._pokedex.remove(pokemon)
         
         new_user = users[new_owner_id]
         new_user["last_pokemon_id"] += 1
@@ -298,35 +373,55 @@ class PokemonRepository:
         pokemon["on_party"] = False
         pokemon["happiness"] = 70
         
-        self._index[(new_owner_id, new_id)] = idx
+        self._index[(new_owner_id, new_id)] = pokemon
+        self._counters.add(pokemon)
+        self._pokedex.add(pokemon)
+        self._persist_seen(new_owner_id)
         self.db.save()
+        if removed is not None:
+            changes.emit(removed)
+            changes.emit(Change.created(POKEMON, new_owner_id, new_id, pokemon))
         
         return pokemon.copy()
     
+    @user_loaded()
     def get_favorites(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and p.get("is_favorite", False)]
     
+    @user_loaded()
     def get_by_species(self, owner_id: str, species_id: int) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and p["species_id"] == species_id]
     
+    @user_loaded()
     def get_shinies(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and p.get("is_shiny", False)]
     
+    @user_loaded()
     def get_legendaries(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and p.get("is_legendary", False)]
     
+    @user_loaded()
     def get_mythicals(self, owner_id: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         return [p.copy() for p in pokemon_list if p["owner_id"] == owner_id and p.get("is_mythical", False)]
     
+    @user_loaded()
     def has_caught_species(self, owner_id: str, species_id: int) -> bool:
-        pokemon_list = self.db.get("pokemon")
-        return any(p["owner_id"] == owner_id and p["species_id"] == species_id for p in pokemon_list)
+        return self._pokedex.get(owner_id).has_caught(species_id)
+    
+    @user_loaded()
+    def has_seen_species(self, owner_id: str, species_id: int) -> bool:
+        return self._pokedex.get(owner_id).has_seen(species_id)
     
+    @user_loaded()
+    def get_pokedex(self, owner_id: str) -> dict:
+        return self._pokedex.get(owner_id).summary()
+    
+    @user_loaded()
     def search(self, owner_id: str, query: str) -> list[dict]:
         pokemon_list = self.db.get("pokemon")
         query_lower = query.lower()
@@ -343,37 +438,34 @@ class PokemonRepository:
         
         return results
     
+    @user_loaded()
     def count_stats(self, owner_id: str) -> dict:
-        pokemon_list = self.db.get("pokemon")
-        
-        stats = {
-            "total": 0,
-            "party": 0,
-            "box": 0,
-            "favorites": 0,
-            "shinies": 0,
-            "legendaries": 0,
-            "mythicals": 0
-        }
-        
-        for p in pokemon_list:
-            if p["owner_id"] != owner_id:
-                continue
+        counts = self._counters.get(owner_id)
+        return {key: counts[key] for key in ("total", "party", "box", "favorites", "shinies", "legendaries", "mythicals")}
+    
+    @user_loaded()
+    def count_collection(self, owner_id: str) -> dict:
+        return self._counters.get(owner_id)
+    
+    def verify_counters(self, stripe: int) -> list[str]:
+        # Counters only change under their owner's stripe, so holding that one stripe is enough to recount its owners;
+        # mismatches are repaired in place while every other stripe keeps writing.
+        stripe_of = self.db.stripe_of
+        with self.db.stripe_locked(stripe):
+            with self.db.structure_lock:
+                owned = [p for p in self.db.get("pokemon") if stripe_of(p["owner_id"]) == stripe]
+                owners = {owner_id for owner_id in self.db.get("users") if stripe_of(owner_id) == stripe}
+            owners.update(p["owner_id"] for p in owned)
+            expected = CollectionCounters.recount(owned)
+            expected_dex = PokedexIndex.recount(owned, self._stored_seen)
             
-            stats["total"] += 1
+            mismatched = self._counters.diff(expected, owners)
+            for owner_id in mismatched:
+                self._counters.set(owner_id, expected.get(owner_id))
             
-            if p.get("on_party", False):
-                stats["party"] += 1
-            else:
-                stats["box"] += 1
-            
-            if p.get("is_favorite", False):
-                stats["favorites"] += 1
-            if p.get("is_shiny", False):
-                stats["shinies"] += 1
-            if p.get("is_legendary", False):
-                stats["legendaries"] += 1
-            if p.get("is_mythical", False):
-                stats["mythicals"] += 1
-        
-        return stats
\ No newline at end of file
+            mismatched_dex = self._pokedex.diff(expected_dex, owners)
+            for owner_id in mismatched_dex:
+                dex = expected_dex.get(owner_id)
+                dex.seen |= self._pokedex.get(owner_id).seen
+                self._pokedex.set(owner_id, dex)
+        return sorted(set(mismatched) | set(mismatched_dex))
\ No newline at end of file
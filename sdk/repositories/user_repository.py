@@ -1,13 +1,15 @@
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 import time
-from sdk.database import Database
+from sdk.database import Database, user_locked, user_loaded
 from sdk.prng import PRNG
+from sdk.events import changes, Change, USER
 
 class UserRepository:
 	def __init__(self, db: Database):
 		self.db = db
 	
+	@user_locked()
 	def create(
 		self,
 		user_id: str,
@@ -34,61 +36,76 @@ class UserRepository:
 			"created_at": datetime.utcnow().isoformat()
 		}
 		
-		users[user_id] = user
+		with self.db.structure_lock:
+			users[user_id] = user
 		self.db.save()
+		if changes.listening(USER):
+			changes.emit(Change.created(USER, user_id, user_id, user))
 		
 		return user.copy()
 	
+	@user_loaded()
 	def get(self, user_id: str) -> Optional[dict]:
 		users = self.db.get("users")
 		user = users.get(user_id)
 		return user.copy() if user else None
 	
+	@user_loaded()
 	def exists(self, user_id: str) -> bool:
 		return user_id in self.db.get("users")
 	
+	@user_loaded()
 	def get_rng(self, user_id: str) -> PRNG:
 		user = self.db.get("users")[user_id]
 		seed = user.get("rng_seed", 0)
 		return PRNG(seed)
 	
-	def save_rng(self, user_id: str, rng: PRNG) -> None:
-		users = self.db.get("users")
-		users[user_id]["rng_seed"] = rng.get_seed()
+	def _set(self, user_id: str, key: str, value: Any) -> Any:
+		user = self.db.get("users")[user_id]
+		before = {key: user.get(key)}
+		
+		user[key] = value
 		self.db.save()
+		if changes.listening(USER):
+			changes.emit(Change.updated(USER, user_id, user_id, before, user))
+		return value
 	
+	@user_locked()
+	def save_rng(self, user_id: str, rng: PRNG) -> None:
+		self._set(user_id, "rng_seed", rng.get_seed())
+	
+	@user_locked()
 	def set_money(self, user_id: str, amount: int) -> int:
-		users = self.db.get("users")
-		users[user_id]["money"] = max(0, int(amount))
-		self.db.save()
-		return users[user_id]["money"]
+		return self._set(user_id, "money", max(0, int(amount)))
 	
+	@user_locked()
 	def add_money(self, user_id: str, amount: int) -> int:
 		users = self.db.get("users")
-		users[user_id]["money"] = max(0, users[user_id]["money"] + int(amount))
-		self.db.save()
-		return users[user_id]["money"]
+		return self._set(user_id, "money", max(0, users[user_id]["money"] + int(amount)))
 	
+	@user_locked()
 	def add_badge(self, user_id: str, badge: str) -> list[str]:
 		users = self.db.get("users")
 		badges = users[user_id].setdefault("badges", [])
 		
 		if badge not in badges:
-			badges.append(badge)
-			self.db.save()
+			self._set(user_id, "badges", [*badges, badge])
+			badges = users[user_id]["badges"]
 		
 		return badges.copy()
 	
+	@user_locked()
 	def remove_badge(self, user_id: str, badge: str) -> list[str]:
 		users = self.db.get("users")
 		badges = users[user_id].setdefault("badges", [])
 		
 		if badge in badges:
-			badges.remove(badge)
-			self.db.save()
+			self._set(user_id, "badges", [b for b in badges if b != badge])
+			badges = users[user_id]["badges"]
 		
 		return badges.copy()
 
+	@user_loaded()
 	def get_timezone(self, user_id: str) -> str:
 		users = self.db.get("users")
 		return users[user_id].get("timezone", "America/Sao_Paulo")
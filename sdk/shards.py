@@ -0,0 +1,107 @@
+import zlib
+import orjson
+from pathlib import Path
+from typing import Callable, Dict, Final, Iterable, List, Optional, Tuple
+from sdk.codecs import DEFAULT_CODEC, encode, decode
+
+SHARD_BUCKETS: Final[int] = 256
+MANIFEST_NAME: Final[str] = "manifest.json"
+
+def empty_shard() -> dict:
+	return {"users": {}, "pokemon": [], "bags": []}
+
+def split_by_bucket(data: dict, bucket_of: Callable[[str], int], only: Optional[Iterable[int]] = None) -> Dict[int, dict]:
+	wanted = set(only) if only is not None else None
+	shards: Dict[int, dict] = {bucket: empty_shard() for bucket in wanted} if wanted is not None else {}
+	
+	def shard_for(user_id: str) -> Optional[dict]:
+		bucket = bucket_of(user_id)
+		if wanted is not None and bucket not in wanted:
+			return None
+		shard = shards.get(bucket)
+		if shard is None:
+			shard = shards[bucket] = empty_shard()
+		return shard
+	
+	for user_id, user in data.get("users", {}).items():
+		shard = shard_for(user_id)
+		if shard is not None:
+			shard["users"][user_id] = user
+	
+	for key in ("pokemon", "bags"):
+		for entry in data.get(key, []):
+			shard = shard_for(entry["owner_id"])
+			if shard is not None:
+				shard[key].append(entry)
+	
+	return shards
+
+class ShardStore:
+	__slots__ = ("root", "buckets", "codec", "_buckets_of")
+	
+	def __init__(self, root: Path, buckets: int = SHARD_BUCKETS, codec: str = DEFAULT_CODEC):
+		self.root = Path(root)
+		self.codec = codec
+		self.root.mkdir(parents=True, exist_ok=True)
+		self._buckets_of: Dict[str, int] = {}
+		
+		manifest = self.root / MANIFEST_NAME
+		if manifest.exists():
+			self.buckets = orjson.loads(manifest.read_bytes())["buckets"]
+		else:
+			self.buckets = buckets
+			manifest.write_bytes(orjson.dumps({"buckets": buckets}))
+	
+	def bucket_of(self, user_id: str) -> int:
+		bucket = self._buckets_of.get(user_id)
+		if bucket is None:
+			bucket = self._buckets_of[user_id] = zlib.crc32(user_id.encode()) % self.buckets
+		return bucket
+	
+	def path_of(self, bucket: int) -> Path:
+		return self.root / f"{bucket:04d}.json"
+	
+	def read(self, bucket: int) -> Tuple[dict, int]:
+		path = self.path_of(bucket)
+		if not path.exists():
+			return empty_shard(), 0
+		
+		payload = path.read_bytes()
+		shard = decode(payload)
+		for key, value in empty_shard().items():
+			shard.setdefault(key, value)
+		return shard, len(payload)
+	
+	def write(self, bucket: int, shard: dict) -> int:
+		payload = encode(shard, self.codec)
+		path = self.path_of(bucket)
+		tmp_path = path.with_suffix(".tmp")
+		tmp_path.write_bytes(payload)
+		tmp_path.replace(path)
+		return len(payload)
+	
+	def files(self) -> List[Path]:
+		return [self.root / MANIFEST_NAME, *(path for path in map(self.path_of, range(self.buckets)) if path.exists())]
+	
+	def clear(self) -> None:
+		for bucket in range(self.buckets):
+			self.path_of(bucket).unlink(missing_ok=True)
+
+def migrate(source: Path, target: Path, buckets: int = SHARD_BUCKETS, codec: str = DEFAULT_CODEC) -> int:
+	data = decode(Path(source).read_bytes())
+	store = ShardStore(target, buckets, codec)
+	
+	for bucket, shard in split_by_bucket(data, store.bucket_of).items():
+		store.write(bucket, shard)
+	
+	return len(data.get("users", {}))
+
+if __name__ == "__main__":
+	import sys
+	
+	source = Path(sys.argv[1] if len(sys.argv) > 1 else "database.json")
+	target = Path(sys.argv[2] if len(sys.argv) > 2 else "database")
+	codec = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_CODEC
+	
+	count = migrate(source, target, codec=codec)
+	print(f"{count} usuários migrados de {source} para {target}")
@@ -1,4 +1,4 @@
-from sdk.database import Database
+from sdk.database import Database, user_locked
 from sdk.api.services import APIService
 from sdk.repositories.user_repository import UserRepository
 from sdk.repositories.pokemon_repository import PokemonRepository
@@ -40,6 +40,7 @@ class Toolkit:
 		
 		object.__setattr__(self, '_initialized', True)
 
+	@user_locked()
 	def create_pokemon(
 		self,
 		owner_id: str,
@@ -81,12 +82,14 @@ class Toolkit:
 	def get_exp_progress(self, growth_type: str, current_exp: int) -> dict:
 		return ExperienceCalculator.get_progress(growth_type, current_exp)
 	
+	@user_locked()
 	def roll_random(self, user_id: str, min_val: int, max_val: int) -> int:
 		rng = self.users.get_rng(user_id)
 		result = rng.randint(min_val, max_val)
 		self.users.save_rng(user_id, rng)
 		return result
 	
+	@user_locked()
 	def roll_chance(self, user_id: str, chance: float) -> bool:
 		rng = self.users.get_rng(user_id)
 		result = rng.random() < chance
@@ -96,6 +99,7 @@ class Toolkit:
 	def roll_shiny(self, user_id: str) -> bool:
 		return self.roll_chance(user_id, 1 / SHINY_ROLL)
 	
+	@user_locked()
 	def roll_ivs(self, user_id: str) -> dict[str, int]:
 		rng = self.users.get_rng(user_id)
 		ivs = {stat: rng.randint(0, 32) for stat in STAT_KEYS}
@@ -0,0 +1,75 @@
+import io
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from utilities import canvas
+
+def _sprite(color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGBA", (48, 48), color).save(buf, "PNG")
+    return buf.getvalue()
+
+@pytest.fixture
+def encodes(monkeypatch):
+    calls = []
+    encode = canvas.encode_image
+
+    def counting(image, policy):
+        calls.append(image.size)
+        return encode(image, policy)
+
+    monkeypatch.setattr(canvas, "encode_image", counting)
+    return calls
+
+@pytest.fixture
+def session():
+    background = Image.new("RGBA", (400, 300), (40, 120, 40, 255))
+    session = canvas.BattleRenderSession(background, _sprite((200, 0, 0, 255)), enemy_key="enemy")
+    yield session
+    session.close()
+
+def test_unchanged_turn_reuses_last_frame(session, encodes):
+    player = _sprite((0, 0, 200, 255))
+
+    first = session.render(player, "player").getvalue()
+    second = session.render(player, "player").getvalue()
+
+    assert first == second
+    assert len(encodes) == 1
+
+def test_new_player_sprite_keeps_base_layer(session, encodes):
+    base = session._base
+
+    blue = session.render(_sprite((0, 0, 200, 255)), "blue").getvalue()
+    yellow = session.render(_sprite((200, 200, 0, 255)), "yellow").getvalue()
+
+    assert blue != yellow
+    assert session._base is base
+    assert len(encodes) == 2
+
+def test_overlay_change_invalidates_frame(session, encodes):
+    player = _sprite((0, 0, 200, 255))
+    plain = session.render(player, "player").getvalue()
+
+    session.set_overlay("hp", Image.new("RGB", (100, 8), (255, 255, 255)), (10, 10))
+    with_overlay = session.render(player, "player").getvalue()
+
+    session.remove_overlay("hp")
+    restored = session.render(player, "player").getvalue()
+
+    assert with_overlay != plain
+    assert restored == plain
+    assert len(encodes) == 3
+
+def test_set_enemy_rebuilds_base_layer(session, encodes):
+    player = _sprite((0, 0, 200, 255))
+    before = session.render(player, "player").getvalue()
+    base = session._base
+
+    session.set_enemy(_sprite((0, 200, 200, 255)), "other")
+    after = session.render(player, "player").getvalue()
+
+    assert session._base is not base
+    assert before != after
+    assert len(encodes) == 2
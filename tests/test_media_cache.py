@@ -0,0 +1,87 @@
+import time
+import pytest
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+discord = pytest.importorskip("discord")
+
+from utilities.media_cache import ATTACHMENT_PREFIX, MediaCache, _cdn_expiry, media_digest
+
+@dataclass
+class FakeAttachment:
+	filename: str
+	url: str
+
+@dataclass
+class FakeMessage:
+	attachments: List[FakeAttachment]
+
+class FakeCDN:
+	__slots__ = ("base_url", "lifetime", "_clock", "uploads", "stored")
+
+	def __init__(self, base_url: str = "https://cdn.local/attachments", lifetime: float = 24 * 60 * 60, clock: Callable[[], float] = time.time):
+		self.base_url = base_url.rstrip("/")
+		self.lifetime = lifetime
+		self._clock = clock
+		self.uploads = 0
+		self.stored: Dict[str, bytes] = {}
+
+	def upload(self, files: Iterable[discord.File]) -> FakeMessage:
+		attachments = []
+		expires = int(self._clock() + self.lifetime)
+
+		for file in files:
+			data = file.fp.read()
+			digest = media_digest(data)
+			self.stored[digest] = data
+			self.uploads += 1
+			attachments.append(FakeAttachment(
+				filename=file.filename,
+				url=f"{self.base_url}/{digest}/{file.filename}?ex={expires:x}"
+			))
+
+		return FakeMessage(attachments)
+
+	def fetch(self, url: str) -> Optional[bytes]:
+		expiry = _cdn_expiry(url)
+		if expiry is not None and self._clock() >= expiry:
+			return None
+		digest = urlparse(url).path.rstrip("/").split("/")[-2]
+		return self.stored.get(digest)
+
+class FakeClock:
+	def __init__(self, now: float = 1_700_000_000.0):
+		self.now = now
+
+	def __call__(self) -> float:
+		return self.now
+
+def test_prepare_commit_reuses_uploaded_urls():
+	clock = FakeClock()
+	cache = MediaCache(ttl=3600, clock=clock)
+	cdn = FakeCDN(clock=clock)
+	assets = {"icon.png": b"icon", "pokemon.png": b"sprite"}
+
+	first = cache.prepare(assets)
+	assert first.refs == {name: f"{ATTACHMENT_PREFIX}{name}" for name in assets}
+	assert len(first.files) == 2
+	cache.commit(first, cdn.upload(first.files))
+
+	second = cache.prepare({**assets, "pokemon.png": b"other sprite"})
+	assert [file.filename for file in second.files] == ["pokemon.png"]
+	assert second.refs["pokemon.png"] == f"{ATTACHMENT_PREFIX}pokemon.png"
+	assert cdn.fetch(second.refs["icon.png"]) == b"icon"
+	assert cache.stats()["hits"] == 1
+	assert cdn.uploads == 2
+
+def test_reuse_stops_before_cdn_expiry():
+	clock = FakeClock()
+	cache = MediaCache(ttl=48 * 3600, clock=clock)
+	cdn = FakeCDN(lifetime=3600, clock=clock)
+
+	batch = cache.prepare({"icon.png": b"icon"})
+	cache.commit(batch, cdn.upload(batch.files))
+
+	clock.now += 3600 - 30
+	assert cache.prepare({"icon.png": b"icon"}).files
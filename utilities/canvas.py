@@ -1,8 +1,23 @@
 import io
 import asyncio
-from typing import List, Tuple
+import hashlib
+import time
+import functools
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
 from PIL import Image, ImageOps
 import numpy as np
+from utilities.sprite_cache import SpritePixelCache
+from utilities.render_cache import RenderCache, render_key
+from utilities.preloaded import get_resource, resource_identity
+from utilities.encoding import DEFAULT_ENCODING, EncodingPolicy, encode_image
+from helpers.metrics import metrics
+
+Background = Union[Image.Image, str]
 
 PROFILE_COORDS: List[Tuple[int, int, int, int]] = [
     (5, -8, 137, 83),
@@ -13,6 +28,176 @@ PROFILE_COORDS: List[Tuple[int, int, int, int]] = [
     (290, 71, 137, 83),
 ]
 
+@dataclass(frozen=True)
+class SpriteLayout:
+    width: int
+    height: int
+    crop: bool = True
+    scale_boost: float = 1.0
+    max_height_ratio: float = 1.0
+    force_height: bool = False
+    max_width_ratio: float = 1.0
+    pad: int = 2
+
+def info_layout(box_size: int = 130, scale_boost: float = 1.0) -> SpriteLayout:
+    return SpriteLayout(box_size, box_size, crop=False, scale_boost=scale_boost, max_height_ratio=0.95, max_width_ratio=0.95, pad=4)
+
+def battle_player_layout(box_size: int = 140) -> SpriteLayout:
+    size = int(box_size * 1.2)
+    return SpriteLayout(size, size, crop=False, scale_boost=1.15, max_height_ratio=0.95, force_height=True, max_width_ratio=0.95, pad=2)
+
+def battle_enemy_layout(box_size: int = 140) -> SpriteLayout:
+    return SpriteLayout(box_size, box_size, crop=False, scale_boost=1.0, max_height_ratio=0.75, force_height=True, max_width_ratio=0.85, pad=2)
+
+def profile_layout(w: int, h: int) -> SpriteLayout:
+    return SpriteLayout(int(w * 0.6), int(h * 0.8), crop=True, pad=1)
+
+DEFAULT_LAYOUTS: Tuple[SpriteLayout, ...] = (
+    info_layout(),
+    battle_player_layout(),
+    battle_enemy_layout(),
+    *dict.fromkeys(profile_layout(w, h) for _, _, w, h in PROFILE_COORDS),
+)
+
+sprite_cache = SpritePixelCache()
+render_cache = RenderCache()
+
+class SingleFlight:
+    __slots__ = ("_inflight", "started", "coalesced")
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "started": self.started, "coalesced": self.coalesced}
+
+render_flights = SingleFlight()
+
+class RenderOverloaded(RuntimeError):
+    pass
+
+def _queued_call(submitted_at: float, func: Callable[..., Any], *args, **kwargs) -> Tuple[float, Any]:
+    waited = max(0.0, time.time() - submitted_at)
+    return waited, func(*args, **kwargs)
+
+class RenderScheduler:
+    __slots__ = ("max_workers", "max_queue", "use_processes", "_executor", "_thread_executor", "_pending", "completed", "rejected")
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 32, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def configure(self, max_workers: int, max_queue: int, use_processes: bool = False) -> None:
+        self.shutdown()
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.use_processes = use_processes
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="render")
+        return self._executor
+
+    def _get_thread_executor(self) -> Executor:
+        if not self.use_processes:
+            return self._get_executor()
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="render-thread")
+        return self._thread_executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, executor: Executor, func: Callable[..., Any], *args, **kwargs) -> Any:
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            metrics.inc("render_rejections_total", help="Render jobs rejected because the queue was full")
+            raise RenderOverloaded(f"Render queue is full ({self._pending} pending)")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(_queued_call, time.time(), func, *args, **kwargs)
+            
+            if isinstance(executor, ThreadPoolExecutor):
+                call = functools.partial(contextvars.copy_context().run, call)
+            
+            waited, result = await loop.run_in_executor(executor, call)
+            metrics.observe("render_queue_wait_seconds", waited, help="Time render jobs spent queued before a worker picked them up")
+            return result
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    async def submit(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._run(self._get_executor(), func, *args, **kwargs)
+
+    async def submit_local(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._run(self._get_thread_executor(), func, *args, **kwargs)
+
+    async def render(self, key: str, func: Callable[..., io.BytesIO], *args, **kwargs) -> bytes:
+        if not self.use_processes:
+            return await self.submit(_render_cached, key, func, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        io_executor = self._get_thread_executor()
+
+        data = await loop.run_in_executor(io_executor, render_cache.get, key)
+        if data is None:
+            data = await self.submit(_render_encoded, func, *args, **kwargs)
+            await loop.run_in_executor(io_executor, render_cache.put, key, data)
+        return data
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=False)
+            self._thread_executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "processes": self.use_processes,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+render_scheduler = RenderScheduler()
+
+RENDER_KEY_EXCLUDE = frozenset({"sprite_key", "player_key", "enemy_key", "party_keys", "encoding"})
+
 def _to_box(sprite_bytes: bytes, box: int) -> Image.Image:
     im = Image.open(io.BytesIO(sprite_bytes)).convert("RGBA")
     im = ImageOps.contain(im, (box, box), method=Image.Resampling.NEAREST)
@@ -77,114 +262,200 @@ def _process_sprite_crop(
     res.close()
     return final
 
+def _sprite_identity(sprite_bytes: bytes, sprite_key: Optional[Hashable]) -> Hashable:
+    if sprite_key is not None:
+        return sprite_key
+    return hashlib.blake2b(sprite_bytes, digest_size=16).digest()
+
+def _get_sprite(sprite_bytes: bytes, layout: SpriteLayout, sprite_key: Optional[Hashable] = None) -> Image.Image:
+    return sprite_cache.get_or_create(
+        (_sprite_identity(sprite_bytes, sprite_key), layout),
+        lambda: _process_sprite_crop(
+            sprite_bytes,
+            layout.width,
+            layout.height,
+            crop=layout.crop,
+            scale_boost=layout.scale_boost,
+            max_height_ratio=layout.max_height_ratio,
+            force_height=layout.force_height,
+            max_width_ratio=layout.max_width_ratio,
+            pad=layout.pad,
+        )
+    )
+
+def warm_sprite_cache(
+    sprites: Iterable[Tuple[Hashable, bytes]],
+    layouts: Iterable[SpriteLayout] = DEFAULT_LAYOUTS,
+) -> int:
+    layouts = tuple(layouts)
+    evictions = sprite_cache.evictions
+    count = 0
+    
+    for sprite_key, sprite_bytes in sprites:
+        # Once the cache starts evicting, further warming would only push out what was just decoded.
+        if sprite_cache.evictions != evictions:
+            break
+        for layout in layouts:
+            try:
+                _get_sprite(sprite_bytes, layout, sprite_key)
+            except OSError:
+                break
+            count += 1
+    
+    return count
+
+def _resolve_background(background: Background) -> Image.Image:
+    if isinstance(background, str):
+        return get_resource(background)
+    return background
+
 def _compose_pokemon(
     sprite_bytes: bytes,
-    background: Image.Image,
+    background: Background,
     box_size: int = 130,
     ground_y: int = 180,
-    scale_boost: float = 1.0
+    scale_boost: float = 1.0,
+    sprite_key: Optional[Hashable] = None,
+    encoding: Optional[EncodingPolicy] = None,
 ) -> io.BytesIO:
-    spr = _process_sprite_crop(
-        sprite_bytes,
-        box_size,
-        box_size,
-        crop=False,
-        scale_boost=scale_boost,
-        max_height_ratio=0.95,
-        force_height=False,
-        max_width_ratio=0.95,
-        pad=4,
-    )
+    spr = _get_sprite(sprite_bytes, info_layout(box_size, scale_boost), sprite_key)
     
-    composed = background.copy()
+    composed = _resolve_background(background).copy()
     x = (composed.width - spr.width) // 2
     y = ground_y - spr.height
     composed.paste(spr, (x, y), spr)
-    spr.close()
     
-    buf = io.BytesIO()
-    composed.save(buf, format="PNG", optimize=False, compress_level=0)
+    buf = encode_image(composed, encoding or DEFAULT_ENCODING)
     composed.close()
-    buf.seek(0)
     return buf
 
 def _compose_battle(
     player_bytes: bytes,
     enemy_bytes: bytes,
-    background: Image.Image,
+    background: Background,
     box_size: int = 140,
     player_ground_y: int = 250,
     enemy_ground_y: int = 140,
     player_x: int = 40,
-    enemy_x: int = 280
+    enemy_x: int = 280,
+    player_key: Optional[Hashable] = None,
+    enemy_key: Optional[Hashable] = None,
+    encoding: Optional[EncodingPolicy] = None,
 ) -> io.BytesIO:
-    composed = background.copy()
+    composed = _resolve_background(background).copy()
     
     if player_bytes:
-        p = _process_sprite_crop(
-            player_bytes,
-            int(box_size * 1.2),
-            int(box_size * 1.2),
-            crop=False,
-            scale_boost=1.15,
-            max_height_ratio=0.95,
-            force_height=True,
-            max_width_ratio=0.95,
-            pad=2,
-        )
+        p = _get_sprite(player_bytes, battle_player_layout(box_size), player_key)
         composed.paste(p, (player_x, player_ground_y - p.height), p)
-        p.close()
         
     if enemy_bytes:
-        e = _process_sprite_crop(
-            enemy_bytes,
-            int(box_size),
-            int(box_size),
-            crop=False,
-            scale_boost=1.0,
-            max_height_ratio=0.75,
-            force_height=True,
-            max_width_ratio=0.85,
-            pad=2,
-        )
+        e = _get_sprite(enemy_bytes, battle_enemy_layout(box_size), enemy_key)
         composed.paste(e, (enemy_x, enemy_ground_y - e.height), e)
-        e.close()
         
-    buf = io.BytesIO()
-    composed.save(buf, format="PNG", optimize=False, compress_level=0)
+    buf = encode_image(composed, encoding or DEFAULT_ENCODING)
     composed.close()
-    buf.seek(0)
     return buf
 
+class BattleRenderSession:
+    def __init__(
+        self,
+        background: Background,
+        enemy_bytes: Optional[bytes] = None,
+        box_size: int = 140,
+        player_ground_y: int = 250,
+        enemy_ground_y: int = 140,
+        player_x: int = 40,
+        enemy_x: int = 280,
+        enemy_key: Optional[Hashable] = None,
+        encoding: Optional[EncodingPolicy] = None,
+    ):
+        self.background = background
+        self.box_size = box_size
+        self.player_ground_y = player_ground_y
+        self.enemy_ground_y = enemy_ground_y
+        self.player_x = player_x
+        self.enemy_x = enemy_x
+        self.encoding = encoding or DEFAULT_ENCODING
+        self._overlays: Dict[str, Tuple[Image.Image, Tuple[int, int]]] = {}
+        self._base: Optional[Image.Image] = None
+        self._last: Optional[Tuple[Hashable, bytes]] = None
+        # Renders run on scheduler threads, so frames are composed one at a time per session.
+        self._lock = threading.Lock()
+        self.set_enemy(enemy_bytes, enemy_key)
+
+    def set_enemy(self, enemy_bytes: Optional[bytes], enemy_key: Optional[Hashable] = None) -> None:
+        base = _resolve_background(self.background).copy()
+        
+        if enemy_bytes:
+            e = _get_sprite(enemy_bytes, battle_enemy_layout(self.box_size), enemy_key)
+            base.paste(e, (self.enemy_x, self.enemy_ground_y - e.height), e)
+        
+        with self._lock:
+            if self._base is not None:
+                self._base.close()
+            self._base = base
+            self._last = None
+
+    def set_overlay(self, name: str, image: Image.Image, position: Tuple[int, int]) -> None:
+        with self._lock:
+            self._overlays[name] = (image, position)
+            self._last = None
+
+    def remove_overlay(self, name: str) -> None:
+        with self._lock:
+            if self._overlays.pop(name, None) is not None:
+                self._last = None
+
+    def render(self, player_bytes: Optional[bytes], player_key: Optional[Hashable] = None) -> io.BytesIO:
+        identity = _sprite_identity(player_bytes, player_key) if player_bytes else None
+        with self._lock:
+            if self._last is not None and self._last[0] == identity:
+                return io.BytesIO(self._last[1])
+            
+            frame = self._base.copy()
+            
+            if player_bytes:
+                p = _get_sprite(player_bytes, battle_player_layout(self.box_size), player_key)
+                frame.paste(p, (self.player_x, self.player_ground_y - p.height), p)
+            
+            for image, position in self._overlays.values():
+                frame.paste(image, position, image if image.mode == "RGBA" else None)
+            
+            data = _render_encoded(encode_image, frame, self.encoding)
+            frame.close()
+            
+            self._last = (identity, data)
+        return io.BytesIO(data)
+
+    async def render_async(self, player_bytes: Optional[bytes], player_key: Optional[Hashable] = None) -> io.BytesIO:
+        return await render_scheduler.submit_local(self.render, player_bytes, player_key)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._base is not None:
+                self._base.close()
+                self._base = None
+            self._last = None
+
 def _compose_profile(
     party_sprites: List[bytes],
-    background: Image.Image,
+    background: Background,
     coords: List[Tuple[int, int, int, int]] = PROFILE_COORDS,
+    party_keys: Optional[List[Optional[Hashable]]] = None,
+    encoding: Optional[EncodingPolicy] = None,
 ) -> io.BytesIO:
-    composed = background.copy()
+    composed = _resolve_background(background).copy()
     
     for i, sprite_bytes in enumerate(party_sprites):
         if i >= len(coords) or not sprite_bytes:
             break
         x, y, w, h = coords[i]
-        spr = _process_sprite_crop(
-            sprite_bytes,
-            int(w * 0.6),
-            int(h * 0.8),
-            crop=True,
-            scale_boost=1.0,
-            max_height_ratio=1.0,
-            force_height=False,
-            max_width_ratio=1.0,
-            pad=1,
-        )
+        sprite_key = party_keys[i] if party_keys and i < len(party_keys) else None
+        spr = _get_sprite(sprite_bytes, profile_layout(w, h), sprite_key)
         composed.paste(spr, (x + 30, y + 15), spr)
-        spr.close()
         
-    buf = io.BytesIO()
-    composed.save(buf, format="PNG", optimize=False, compress_level=0)
+    buf = encode_image(composed, encoding or DEFAULT_ENCODING)
     composed.close()
-    buf.seek(0)
     return buf
 
 def _colorize_sprite_fast(sprite: Image.Image, color: Tuple[int, int, int]) -> Image.Image:
@@ -197,6 +468,47 @@ def _colorize_sprite_fast(sprite: Image.Image, color: Tuple[int, int, int]) -> I
     result[:, :, 3] = arr[:, :, 3]
     return Image.fromarray(result, 'RGBA')
 
+def _sprite_canvas(sprite: Image.Image, canvas_size: Tuple[int, int]) -> np.ndarray:
+    canvas = Image.new('RGB', canvas_size, (0, 0, 0))
+    x = (canvas_size[0] - sprite.width) // 2
+    y = (canvas_size[1] - sprite.height) // 2
+    canvas.paste(sprite, (x, y), sprite)
+    arr = np.asarray(canvas, dtype=np.uint8)
+    canvas.close()
+    return arr
+
+def _shared_palette(canvases: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:
+    shape = canvases[0].shape[:2]
+    stacked = np.concatenate([c.reshape(-1, 3) for c in canvases])
+    packed = (stacked[:, 0].astype(np.uint32) << 16) | (stacked[:, 1].astype(np.uint32) << 8) | stacked[:, 2]
+    colors, inverse = np.unique(packed, return_inverse=True)
+    
+    if len(colors) <= 256:
+        palette = np.stack([(colors >> 16) & 0xFF, (colors >> 8) & 0xFF, colors & 0xFF], axis=1).astype(np.uint8)
+        indices = inverse.astype(np.uint8)
+    else:
+        strip = Image.fromarray(stacked.reshape(-1, shape[1], 3), 'RGB')
+        quantized = strip.quantize(colors=256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+        palette = np.array(quantized.getpalette()[:768], dtype=np.uint8).reshape(-1, 3)
+        indices = np.asarray(quantized, dtype=np.uint8).reshape(-1)
+        strip.close()
+        quantized.close()
+    
+    size = shape[0] * shape[1]
+    return palette, [indices[i * size:(i + 1) * size].reshape(shape) for i in range(len(canvases))]
+
+def _palette_frame(indices: np.ndarray, palette: np.ndarray) -> Image.Image:
+    frame = Image.fromarray(indices, 'P')
+    frame.putpalette(palette.tobytes())
+    return frame
+
+def _push_frame(frames: List[Image.Image], durations: List[int], frame: Image.Image, duration: int) -> None:
+    if frames and frames[-1] is frame:
+        durations[-1] += duration
+    else:
+        frames.append(frame)
+        durations.append(duration)
+
 def _compose_evolution(
     sprite_from_bytes: bytes,
     sprite_to_bytes: bytes,
@@ -218,53 +530,47 @@ def _compose_evolution(
     )
     sprite_to_raw.close()
     
-    def create_canvas_with_sprite(sprite: Image.Image) -> Image.Image:
-        canvas = Image.new('RGB', canvas_size, (0, 0, 0))
-        sprite_rgb = Image.new('RGB', sprite.size, (0, 0, 0))
-        sprite_rgb.paste(sprite, (0, 0), sprite)
-        x = (canvas_size[0] - sprite.width) // 2
-        y = (canvas_size[1] - sprite.height) // 2
-        canvas.paste(sprite_rgb, (x, y))
-        return canvas
+    white_sprite_from = _colorize_sprite_fast(sprite_from, (255, 255, 255))
+    white_sprite_to = _colorize_sprite_fast(sprite_to, (255, 255, 255))
+    
+    palette, (idx_from, idx_white_from, idx_white_to, idx_to) = _shared_palette([
+        _sprite_canvas(sprite_from, canvas_size),
+        _sprite_canvas(white_sprite_from, canvas_size),
+        _sprite_canvas(white_sprite_to, canvas_size),
+        _sprite_canvas(sprite_to, canvas_size),
+    ])
     
-    frames = []
-    durations = []
+    sprite_from.close()
+    sprite_to.close()
+    white_sprite_from.close()
+    white_sprite_to.close()
     
-    canvas_from = create_canvas_with_sprite(sprite_from)
-    white_sprite_from = _colorize_sprite_fast(sprite_from, (255, 255, 255))
-    white_canvas_from = create_canvas_with_sprite(white_sprite_from)
+    canvas_from = _palette_frame(idx_from, palette)
+    white_canvas_from = _palette_frame(idx_white_from, palette)
+    white_canvas_to = _palette_frame(idx_white_to, palette)
+    canvas_to = _palette_frame(idx_to, palette)
     
-    for _ in range(5):
-        frames.append(canvas_from.copy())
-        durations.append(100)
-        frames.append(white_canvas_from.copy())
-        durations.append(100)
+    frames: List[Image.Image] = []
+    durations: List[int] = []
     
-    white_sprite_to = _colorize_sprite_fast(sprite_to, (255, 255, 255))
-    white_canvas_to = create_canvas_with_sprite(white_sprite_to)
+    for _ in range(5):
+        _push_frame(frames, durations, canvas_from, 100)
+        _push_frame(frames, durations, white_canvas_from, 100)
     
     for _ in range(22):
-        frames.append(white_canvas_from.copy())
-        durations.append(50)
-        frames.append(white_canvas_to.copy())
-        durations.append(50)
-    
-    canvas_to = create_canvas_with_sprite(sprite_to)
+        _push_frame(frames, durations, white_canvas_from, 50)
+        _push_frame(frames, durations, white_canvas_to, 50)
     
+    headroom = 255.0 - palette.astype(np.float32)
     for i in range(12):
-        frame = Image.new('RGB', canvas_size, (0, 0, 0))
-        frame.paste(canvas_to, (0, 0))
         intensity = int(255 * (1.0 - (i / 11.0)))
-        blend = Image.blend(
-            frame, 
-            Image.new('RGB', canvas_size, (255, 255, 255)), 
-            intensity / 255.0
-        )
-        frames.append(blend)
-        durations.append(60)
+        if intensity == 0:
+            _push_frame(frames, durations, canvas_to, 60)
+            continue
+        faded = np.rint(palette + headroom * (intensity / 255.0)).astype(np.uint8)
+        _push_frame(frames, durations, _palette_frame(idx_to, faded), 60)
     
-    frames.append(canvas_to.copy())
-    durations.append(2500)
+    _push_frame(frames, durations, canvas_to, 2500)
     
     buf = io.BytesIO()
     frames[0].save(
@@ -275,25 +581,80 @@ def _compose_evolution(
         duration=durations,
         loop=0,
         optimize=False,
-        disposal=2
+        disposal=1
     )
     buf.seek(0)
     
-    sprite_from.close()
-    sprite_to.close()
-    white_sprite_from.close()
-    white_sprite_to.close()
+    for frame in frames:
+        frame.close()
     
     return buf
 
-async def compose_evolution_async(*args, **kwargs) -> io.BytesIO:
-    return await asyncio.to_thread(_compose_evolution, *args, **kwargs)
+def _image_digest(image: Image.Image) -> bytes:
+    digest = image.info.get("digest")
+    if digest is None:
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        image.info["digest"] = digest
+    return digest
+
+def _background_identity(background: Background) -> Hashable:
+    # Named resources are keyed by name and file stat, so building a key never decodes an arena on the
+    # event loop and renders cached on disk stop matching once the asset is replaced.
+    if isinstance(background, str):
+        return resource_identity(background)
+    return _image_digest(background)
+
+def _render_key(kind: str, sprites: Iterable[Optional[bytes]], background: Background, kwargs: dict) -> str:
+    return render_key(
+        kind,
+        *(s or b"" for s in sprites),
+        _background_identity(background),
+        kwargs.get("encoding") or DEFAULT_ENCODING,
+        tuple(sorted((k, v) for k, v in kwargs.items() if k not in RENDER_KEY_EXCLUDE)),
+    )
+
+def _render_encoded(func: Callable[..., io.BytesIO], *args, **kwargs) -> bytes:
+    buf = func(*args, **kwargs)
+    data = buf.getvalue()
+    buf.close()
+    return data
+
+def _render_cached(key: str, func: Callable[..., io.BytesIO], *args, **kwargs) -> bytes:
+    data = render_cache.get(key)
+    if data is None:
+        data = _render_encoded(func, *args, **kwargs)
+        render_cache.put(key, data)
+    return data
+
+async def _compose_cached(key: str, func, *args, **kwargs) -> io.BytesIO:
+    data = render_cache.get_memory(key)
+    if data is None:
+        data = await render_flights.run(
+            key,
+            lambda: render_scheduler.render(key, func, *args, **kwargs)
+        )
+    return io.BytesIO(data)
+
+def cache_stats() -> dict:
+    return {
+        "sprites": sprite_cache.stats(),
+        "renders": render_cache.stats(),
+        "flights": render_flights.stats(),
+        "scheduler": render_scheduler.stats(),
+    }
+
+async def compose_evolution_async(sprite_from_bytes: bytes, sprite_to_bytes: bytes, **kwargs) -> io.BytesIO:
+    key = render_key("evolution", sprite_from_bytes, sprite_to_bytes, tuple(sorted(kwargs.items())))
+    return await _compose_cached(key, _compose_evolution, sprite_from_bytes, sprite_to_bytes, **kwargs)
 
-async def compose_pokemon_async(*args, **kwargs) -> io.BytesIO:
-    return await asyncio.to_thread(_compose_pokemon, *args, **kwargs)
+async def compose_pokemon_async(sprite_bytes: bytes, background: Background, **kwargs) -> io.BytesIO:
+    key = _render_key("pokemon", (sprite_bytes,), background, kwargs)
+    return await _compose_cached(key, _compose_pokemon, sprite_bytes, background, **kwargs)
 
-async def compose_battle_async(*args, **kwargs) -> io.BytesIO:
-    return await asyncio.to_thread(_compose_battle, *args, **kwargs)
+async def compose_battle_async(player_bytes: bytes, enemy_bytes: bytes, background: Background, **kwargs) -> io.BytesIO:
+    key = _render_key("battle", (player_bytes, enemy_bytes), background, kwargs)
+    return await _compose_cached(key, _compose_battle, player_bytes, enemy_bytes, background, **kwargs)
 
-async def compose_profile_async(*args, **kwargs) -> io.BytesIO:
-    return await asyncio.to_thread(_compose_profile, *args, **kwargs)
+async def compose_profile_async(party_sprites: List[bytes], background: Background, **kwargs) -> io.BytesIO:
+    key = _render_key("profile", party_sprites, background, kwargs)
+    return await _compose_cached(key, _compose_profile, party_sprites, background, **kwargs)
@@ -0,0 +1,90 @@
+import io
+from dataclasses import dataclass
+from typing import Final, Optional, Tuple
+from PIL import Image
+import numpy as np
+from helpers.metrics import phase
+
+@dataclass(frozen=True)
+class EncodingPolicy:
+    format: str = "PNG"
+    palette: bool = True
+    lossy_palette: bool = False
+    compress_levels: Tuple[int, ...] = (6, 9)
+    size_budget: Optional[int] = 48 * 1024
+    webp_method: int = 4
+
+    @property
+    def extension(self) -> str:
+        return self.format.lower()
+
+# benchmarks/encoding.py found no per-composite difference worth a separate policy: an exact palette at
+# level 6 halves every output, and level 9 triples encode time for about 5% fewer bytes.
+DEFAULT_ENCODING: Final[EncodingPolicy] = EncodingPolicy()
+
+def _exact_palette(image: Image.Image) -> Optional[Image.Image]:
+    rgba = np.asarray(image.convert("RGBA"), dtype=np.uint8)
+    packed = rgba.view(np.uint32).reshape(rgba.shape[:2])
+    colors, inverse = np.unique(packed, return_inverse=True)
+
+    if len(colors) > 256:
+        return None
+
+    entries = colors.view(np.uint8).reshape(-1, 4)
+    result = Image.fromarray(inverse.reshape(packed.shape).astype(np.uint8), "P")
+    result.putpalette(entries[:, :3].tobytes())
+
+    alpha = entries[:, 3]
+    if (alpha != 255).any():
+        result.info["transparency"] = alpha.tobytes()
+
+    return result
+
+def _to_palette(image: Image.Image, policy: EncodingPolicy) -> Optional[Image.Image]:
+    if image.mode == "P":
+        return image
+
+    palettized = _exact_palette(image)
+
+    if palettized is None and policy.lossy_palette:
+        palettized = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+    return palettized
+
+def _save_png(image: Image.Image, compress_level: int) -> io.BytesIO:
+    buf = io.BytesIO()
+    params = {"compress_level": compress_level}
+    if "transparency" in image.info:
+        params["transparency"] = image.info["transparency"]
+    image.save(buf, format="PNG", optimize=False, **params)
+    return buf
+
+def encode_image(image: Image.Image, policy: EncodingPolicy) -> io.BytesIO:
+    with phase("encode"):
+        return _encode_image(image, policy)
+
+def _encode_image(image: Image.Image, policy: EncodingPolicy) -> io.BytesIO:
+    if policy.format == "WEBP":
+        buf = io.BytesIO()
+        image.save(buf, format="WEBP", lossless=True, method=policy.webp_method)
+        buf.seek(0)
+        return buf
+
+    target = image
+    if policy.palette:
+        target = _to_palette(image, policy) or image
+
+    if target.mode == "RGBA" and target.getextrema()[3][0] == 255:
+        target = target.convert("RGB")
+
+    buf = None
+    for level in policy.compress_levels:
+        buf = _save_png(target, level)
+        if policy.size_budget is None or buf.tell() <= policy.size_budget:
+            break
+
+    if target is not image:
+        target.close()
+
+    buf.seek(0)
+    return buf
@@ -0,0 +1,123 @@
+import io
+import time
+import hashlib
+import threading
+import discord
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Protocol
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_MEDIA_TTL = 12 * 60 * 60
+ATTACHMENT_PREFIX = "attachment://"
+
+class AttachmentLike(Protocol):
+	filename: str
+	url: str
+
+class MessageLike(Protocol):
+	attachments: List[AttachmentLike]
+
+def media_digest(data: bytes) -> str:
+	return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _cdn_expiry(url: str) -> Optional[float]:
+	values = parse_qs(urlparse(url).query).get("ex")
+	if not values:
+		return None
+	try:
+		return float(int(values[0], 16))
+	except ValueError:
+		return None
+
+@dataclass
+class MediaBatch:
+	refs: Dict[str, str] = field(default_factory=dict)
+	files: List[discord.File] = field(default_factory=list)
+	pending: Dict[str, str] = field(default_factory=dict)
+
+class MediaCache:
+	__slots__ = ("ttl", "_clock", "_urls", "_lock", "hits", "misses")
+
+	def __init__(self, ttl: float = DEFAULT_MEDIA_TTL, clock: Callable[[], float] = time.time):
+		self.ttl = ttl
+		self._clock = clock
+		self._urls: Dict[str, tuple[str, float]] = {}
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, digest: str) -> Optional[str]:
+		with self._lock:
+			entry = self._urls.get(digest)
+			if entry is None:
+				return None
+
+			url, expires_at = entry
+			if self._clock() >= expires_at:
+				del self._urls[digest]
+				return None
+
+			return url
+
+	def remember(self, digest: str, url: str) -> None:
+		expires_at = self._clock() + self.ttl
+		cdn_expiry = _cdn_expiry(url)
+
+		if cdn_expiry is not None:
+			expires_at = min(expires_at, cdn_expiry - 60)
+
+		with self._lock:
+			self._urls[digest] = (url, expires_at)
+
+	def invalidate(self, digest: str) -> None:
+		with self._lock:
+			self._urls.pop(digest, None)
+
+	def purge_expired(self) -> int:
+		now = self._clock()
+		with self._lock:
+			expired = [d for d, (_, expires_at) in self._urls.items() if now >= expires_at]
+			for digest in expired:
+				del self._urls[digest]
+		return len(expired)
+
+	def prepare(self, assets: Dict[str, bytes]) -> MediaBatch:
+		batch = MediaBatch()
+
+		for filename, data in assets.items():
+			digest = media_digest(data)
+			url = self.get(digest)
+
+			if url is not None:
+				self.hits += 1
+				batch.refs[filename] = url
+				continue
+
+			self.misses += 1
+			batch.refs[filename] = f"{ATTACHMENT_PREFIX}{filename}"
+			batch.files.append(discord.File(io.BytesIO(data), filename))
+			batch.pending[filename] = digest
+
+		return batch
+
+	def commit(self, batch: MediaBatch, message: Optional[MessageLike]) -> None:
+		if message is None or not batch.pending:
+			return
+
+		for attachment in message.attachments:
+			digest = batch.pending.get(attachment.filename)
+			if digest is not None:
+				self.remember(digest, attachment.url)
+
+	def stats(self) -> dict:
+		with self._lock:
+			entries = len(self._urls)
+		total = self.hits + self.misses
+		return {
+			"entries": entries,
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": self.hits / total if total else 0.0,
+		}
+
+media_cache = MediaCache()
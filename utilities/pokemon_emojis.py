@@ -1,21 +1,99 @@
 import discord
 import sys
-from typing import Final
+import asyncio
+import hashlib
+import orjson
+from pathlib import Path
+from typing import Final, Optional
 
 _emoji_cache: dict[str, str] = {}
 _EMOJI_FORMAT: Final[str] = "<:{}:{}>"
+EMOJI_CACHE_PATH: Final[Path] = Path("cache/emojis.json")
+EMOJI_CACHE_SCHEMA: Final[int] = 1
 
-async def load_application_emojis(bot: discord.Client) -> None:
+_refresh_task: Optional[asyncio.Task] = None
+
+def _emoji_version(emojis: dict[str, int]) -> str:
+	digest = hashlib.blake2b(digest_size=12)
+	for name, emoji_id in sorted(emojis.items()):
+		digest.update(f"{name}:{emoji_id}\n".encode())
+	return digest.hexdigest()
+
+def _build_cache(emojis: dict[str, int]) -> dict[str, str]:
+	return {
+		sys.intern(name): _EMOJI_FORMAT.format(name, emoji_id)
+		for name, emoji_id in emojis.items()
+	}
+
+def load_cached_emojis(application_id: Optional[int], path: Path = EMOJI_CACHE_PATH) -> bool:
 	global _emoji_cache
 	
-	emojis = await bot.fetch_application_emojis()
+	try:
+		payload = orjson.loads(path.read_bytes())
+	except (OSError, orjson.JSONDecodeError):
+		return False
+	
+	emojis = payload.get("emojis")
 	
-	_emoji_cache = {
-		sys.intern(e.name): _EMOJI_FORMAT.format(e.name, e.id)
-		for e in emojis
+	if (
+		payload.get("schema") != EMOJI_CACHE_SCHEMA
+		or payload.get("application_id") != application_id
+		or not isinstance(emojis, dict)
+		or payload.get("version") != _emoji_version(emojis)
+	):
+		return False
+	
+	_emoji_cache = _build_cache(emojis)
+	print(f"Carregados {len(_emoji_cache)} application emojis do cache")
+	return True
+
+def save_cached_emojis(application_id: Optional[int], emojis: dict[str, int], path: Path = EMOJI_CACHE_PATH) -> None:
+	payload = {
+		"schema": EMOJI_CACHE_SCHEMA,
+		"application_id": application_id,
+		"version": _emoji_version(emojis),
+		"emojis": emojis,
 	}
 	
+	try:
+		path.parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = path.with_suffix(".tmp")
+		tmp_path.write_bytes(orjson.dumps(payload))
+		tmp_path.replace(path)
+	except OSError as e:
+		print(f"Falha ao salvar cache de emojis: {e}")
+
+async def refresh_application_emojis(bot: discord.Client, path: Path = EMOJI_CACHE_PATH) -> bool:
+	global _emoji_cache
+	
+	fetched = await bot.fetch_application_emojis()
+	emojis = {e.name: e.id for e in fetched}
+	
+	cache = _build_cache(emojis)
+	if cache == _emoji_cache:
+		return False
+	
+	_emoji_cache = cache
+	save_cached_emojis(bot.application_id, emojis, path)
+	
 	print(f"Carregados {len(_emoji_cache)} application emojis")
+	return True
+
+async def _refresh_in_background(bot: discord.Client, path: Path) -> None:
+	try:
+		await refresh_application_emojis(bot, path)
+	except discord.HTTPException as e:
+		print(f"Falha ao atualizar application emojis: {e}")
+
+async def load_application_emojis(bot: discord.Client, path: Path = EMOJI_CACHE_PATH) -> None:
+	global _refresh_task
+	
+	if _emoji_cache or load_cached_emojis(bot.application_id, path):
+		if _refresh_task is None or _refresh_task.done():
+			_refresh_task = asyncio.create_task(_refresh_in_background(bot, path))
+		return
+	
+	await refresh_application_emojis(bot, path)
 
 def get_app_emoji(name: str) -> str:
 	return _emoji_cache.get(name, "")
\ No newline at end of file
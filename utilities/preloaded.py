@@ -1,5 +1,12 @@
+import os
+import asyncio
+import threading
+import psutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from PIL import Image
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 
 BACKGROUNDS: Dict[str, str] = {
 	"grassland": "resources/backgrounds/route.jpg",
@@ -44,24 +51,214 @@ TARGET_SIZE = (400, 225)
 CONVERT_MODE = "RGBA"
 RESAMPLE = Image.Resampling.NEAREST
 
+def _load_image(path: str, resize: bool) -> Image.Image:
+	with Image.open(path) as img:
+		if resize:
+			return img.convert(CONVERT_MODE).resize(TARGET_SIZE, RESAMPLE)
+		return img.convert(CONVERT_MODE)
+
+def _image_nbytes(image: Image.Image) -> int:
+	return image.width * image.height * len(image.getbands())
+
+def _process_rss() -> int:
+	return psutil.Process(os.getpid()).memory_info().rss
+
+@dataclass(frozen=True)
+class ResourceGroup:
+	mapping: Dict[str, str]
+	cache: Dict[str, Image.Image]
+	resize: bool
+	critical: bool = True
+	lazy: bool = False
+
+@dataclass
+class AssetInfo:
+	ref: str
+	path: str
+	nbytes: int
+	critical: bool
+
+class ResourceManager:
+	__slots__ = ("groups", "max_bytes", "max_workers", "_lock", "_evictable", "_evictable_bytes", "_assets", "loads", "evictions", "preload_rss_delta")
+	
+	def __init__(self, groups: Dict[str, ResourceGroup], max_bytes: Optional[int] = None, max_workers: int = 4):
+		self.groups = groups
+		self.max_bytes = max_bytes
+		self.max_workers = max_workers
+		self._lock = threading.RLock()
+		self._evictable: OrderedDict[str, int] = OrderedDict()
+		self._evictable_bytes = 0
+		self._assets: Dict[str, AssetInfo] = {}
+		self.loads = 0
+		self.evictions = 0
+		self.preload_rss_delta = 0
+	
+	def configure(self, max_bytes: Optional[int] = None, max_workers: Optional[int] = None) -> None:
+		self.max_bytes = max_bytes
+		if max_workers is not None:
+			self.max_workers = max(1, max_workers)
+		with self._lock:
+			self._enforce_budget()
+	
+	def _split(self, ref: str) -> Tuple[ResourceGroup, str]:
+		group, _, key = ref.partition(":")
+		if group not in self.groups or key not in self.groups[group].mapping:
+			raise KeyError(f"Unknown resource: {ref}")
+		return self.groups[group], key
+	
+	def has(self, ref: str) -> bool:
+		group, _, key = ref.partition(":")
+		return group in self.groups and key in self.groups[group].mapping
+	
+	def identity(self, ref: str) -> Tuple[str, int, int]:
+		group, key = self._split(ref)
+		stat = os.stat(group.mapping[key])
+		return ref, stat.st_mtime_ns, stat.st_size
+	
+	def get(self, ref: str) -> Image.Image:
+		group, key = self._split(ref)
+		
+		with self._lock:
+			image = group.cache.get(key)
+			if image is not None:
+				if ref in self._evictable:
+					self._evictable.move_to_end(ref)
+				return image
+		
+		return self._load(ref)
+	
+	def _load(self, ref: str) -> Image.Image:
+		group, key = self._split(ref)
+		path = group.mapping[key]
+		
+		image = _load_image(path, group.resize)
+		
+		with self._lock:
+			existing = group.cache.get(key)
+			if existing is not None:
+				image.close()
+				return existing
+			
+			self._store(ref, group, key, image, path)
+			return image
+	
+	def _store(self, ref: str, group: ResourceGroup, key: str, image: Image.Image, path: str) -> None:
+		nbytes = _image_nbytes(image)
+		group.cache[key] = image
+		self._assets[ref] = AssetInfo(ref, path, nbytes, group.critical)
+		self.loads += 1
+		
+		if not group.critical:
+			self._evictable[ref] = nbytes
+			self._evictable_bytes += nbytes
+			self._enforce_budget(keep=ref)
+	
+	def _enforce_budget(self, keep: Optional[str] = None) -> None:
+		if self.max_bytes is None:
+			return
+		
+		while self._evictable_bytes > self.max_bytes and self._evictable:
+			ref = next(iter(self._evictable))
+			if ref == keep:
+				if len(self._evictable) == 1:
+					break
+				self._evictable.move_to_end(ref)
+				continue
+			self.evict(ref)
+	
+	def evict(self, ref: str) -> bool:
+		group, key = self._split(ref)
+		
+		with self._lock:
+			image = group.cache.pop(key, None)
+			if image is None:
+				return False
+			
+			nbytes = self._evictable.pop(ref, None)
+			if nbytes is not None:
+				self._evictable_bytes -= nbytes
+			self._assets.pop(ref, None)
+			self.evictions += 1
+		
+		return True
+	
+	def refs(self, groups: Optional[Iterable[str]] = None, include_lazy: bool = False) -> List[str]:
+		names = list(groups) if groups is not None else list(self.groups)
+		refs = []
+		
+		for name in names:
+			group = self.groups[name]
+			if group.lazy and not include_lazy and groups is None:
+				continue
+			refs.extend(f"{name}:{key}" for key in group.mapping if key not in group.cache)
+		
+		return refs
+	
+	def preload(self, groups: Optional[Iterable[str]] = None) -> int:
+		refs = self.refs(groups)
+		if not refs:
+			return 0
+		
+		# Assets load in parallel, so process RSS is only meaningful around the whole batch; per-asset cost is nbytes.
+		rss_before = _process_rss()
+		with ThreadPoolExecutor(max_workers=min(self.max_workers, len(refs)), thread_name_prefix="resource-load") as executor:
+			list(executor.map(self._load, refs))
+		self.preload_rss_delta = max(0, _process_rss() - rss_before)
+		
+		return len(refs)
+	
+	async def preload_async(self, groups: Optional[Iterable[str]] = None) -> int:
+		return await asyncio.to_thread(self.preload, groups)
+	
+	def report(self) -> dict:
+		with self._lock:
+			assets = sorted(self._assets.values(), key=lambda a: a.nbytes, reverse=True)
+			return {
+				"rss": _process_rss(),
+				"preload_rss_delta": self.preload_rss_delta,
+				"bytes": sum(a.nbytes for a in assets),
+				"evictable_bytes": self._evictable_bytes,
+				"max_bytes": self.max_bytes,
+				"loads": self.loads,
+				"evictions": self.evictions,
+				"assets": [
+					{"ref": a.ref, "path": a.path, "bytes": a.nbytes, "critical": a.critical}
+					for a in assets
+				],
+			}
+
+RESOURCE_GROUPS: Dict[str, ResourceGroup] = {
+	"backgrounds": ResourceGroup(BACKGROUNDS, preloaded_backgrounds, True),
+	"info": ResourceGroup(INFO_BACKGROUNDS, preloaded_info_backgrounds, True),
+	"textures": ResourceGroup(TEXTURES, preloaded_textures, False),
+	"arena": ResourceGroup(BATTLE_TEXTURES_ARENA, preloaded_textures_arena, False, critical=False, lazy=True),
+}
+
+resource_manager = ResourceManager(RESOURCE_GROUPS)
+
 def preload(mapping: Dict[str, str], cache: Dict[str, Image.Image], resize: bool = True) -> None:
 	for key, path in mapping.items():
 		if key in cache:
 			continue
-		with Image.open(path) as img:
-			if resize:
-				cache[key] = img.convert(CONVERT_MODE).resize(TARGET_SIZE, RESAMPLE)
-			else:
-				cache[key] = img.convert(CONVERT_MODE)
+		cache[key] = _load_image(path, resize)
 
 def preload_backgrounds() -> None:
-	preload(BACKGROUNDS, preloaded_backgrounds)
+	resource_manager.preload(["backgrounds"])
 
 def preload_info_backgrounds() -> None:
-	preload(INFO_BACKGROUNDS, preloaded_info_backgrounds)
+	resource_manager.preload(["info"])
 
 def preload_textures() -> None:
-	preload(TEXTURES, preloaded_textures, False)
+	resource_manager.preload(["textures"])
 
 def preload_textures_arena() -> None:
-	preload(BATTLE_TEXTURES_ARENA, preloaded_textures_arena, False)
\ No newline at end of file
+	resource_manager.preload(["arena"])
+
+def has_resource(ref: str) -> bool:
+	return resource_manager.has(ref)
+
+def get_resource(ref: str) -> Image.Image:
+	return resource_manager.get(ref)
+
+def resource_identity(ref: str) -> Tuple[str, int, int]:
+	return resource_manager.identity(ref)
\ No newline at end of file
@@ -0,0 +1,186 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_RENDER_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_RENDER_CACHE_DIR = Path("cache/renders")
+DEFAULT_RENDER_DISK_BYTES = 256 * 1024 * 1024
+DISK_PRUNE_RATIO = 0.9
+
+def render_key(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(b"b")
+            digest.update(part)
+        else:
+            digest.update(b"r")
+            digest.update(repr(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+class RenderCache:
+    __slots__ = (
+        "max_bytes", "directory", "disk_max_bytes", "_entries", "_lock", "_size",
+        "_disk_size", "_pruning", "memory_hits", "disk_hits", "misses", "bytes_saved"
+    )
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_RENDER_CACHE_BYTES,
+        directory: Optional[Path] = DEFAULT_RENDER_CACHE_DIR,
+        disk_max_bytes: Optional[int] = DEFAULT_RENDER_DISK_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._disk_size: Optional[int] = None
+        self._pruning = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.bin"
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                self.bytes_saved += len(data)
+            return data
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self.get_memory(key)
+        if data is not None:
+            return data
+
+        if self.directory is not None:
+            try:
+                data = self._disk_path(key).read_bytes()
+            except OSError:
+                data = None
+
+            if data is not None:
+                self._put_memory(key, data)
+                with self._lock:
+                    self.disk_hits += 1
+                    self.bytes_saved += len(data)
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        self._put_memory(key, data)
+
+        if self.directory is not None:
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(data)
+                tmp_path.replace(path)
+            except OSError:
+                return
+            self._account_disk(len(data))
+
+    def _account_disk(self, added: int) -> None:
+        if self.disk_max_bytes is None:
+            return
+
+        # The first write scans the directory once; after that the running total decides when to prune.
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += added
+            over = self._disk_size is None or self._disk_size > self.disk_max_bytes
+
+        if over and self._pruning.acquire(blocking=False):
+            try:
+                self.prune_disk(int(self.disk_max_bytes * DISK_PRUNE_RATIO))
+            finally:
+                self._pruning.release()
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = data
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def configure_disk(self, max_bytes: Optional[int]) -> None:
+        self.disk_max_bytes = max_bytes
+        with self._lock:
+            self._disk_size = None
+
+    def prune_disk(self, max_bytes: Optional[int] = None) -> int:
+        if max_bytes is None:
+            max_bytes = self.disk_max_bytes
+        if self.directory is None or not self.directory.exists():
+            return 0
+
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = Path(root) / name
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        removed = 0
+
+        for _, size, path in sorted(files):
+            if max_bytes is None or total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._disk_size = total
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "hit_rate": hits / total if total else 0.0,
+            }
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+from PIL import Image
+
+DEFAULT_SPRITE_CACHE_BYTES = 64 * 1024 * 1024
+
+def _image_nbytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+class SpritePixelCache:
+    __slots__ = ("max_bytes", "_entries", "_lock", "_size", "hits", "misses", "evictions")
+
+    def __init__(self, max_bytes: int = DEFAULT_SPRITE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, Image.Image] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key: Hashable, image: Image.Image) -> None:
+        nbytes = _image_nbytes(image)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= _image_nbytes(previous)
+
+            self._entries[key] = image
+            self._size += nbytes
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= _image_nbytes(evicted)
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Image.Image]) -> Image.Image:
+        image = self.get(key)
+        if image is None:
+            image = factory()
+            self.put(key, image)
+        return image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)